@@ -0,0 +1,121 @@
+"""
+Benchmark: WARP collection against a local mock of the consent-gated site.
+
+The mock serves, on 127.0.0.1:
+  /index.html             links to N_PAGES pages
+  /hpaa195801_2_NNN.html  page text
+Until the "consent" cookie is set, every URL answers with a consent page
+whose "必要最小限" button sets the cookie in JavaScript and reloads, so
+only a real browser can get past it (as on WARP).
+
+Compared:
+  per-page   a fresh WarpSession per page (browser launched for each,
+             like running .archive/consent.py before every fetch)
+  shared     one WarpSession for the whole crawl: one launch + consent,
+             then cookies exported to requests for the remaining pages
+
+Needs Playwright's Chromium (`python -m playwright install chromium`).
+
+Run:
+  python -m benchmarks.bench_collect
+  python -m benchmarks.bench_collect --serve      # run only the mock, then e.g.
+  python collect.py --index-url http://127.0.0.1:8766/index.html --out /tmp/warp --sleep 0
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+import collect
+from collect import WarpSession, page_links
+
+N_PAGES = 30
+PORT = 8766
+
+CONSENT_HTML = """<html><body>
+<p>このサイトはCookieを使用します。</p>
+<button onclick="document.cookie='consent=1; path=/'; location.reload()">必要最小限のCookieのみ許可</button>
+</body></html>"""
+
+
+class MockWarp(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if "consent=1" not in self.headers.get("Cookie", ""):
+            body = CONSENT_HTML
+        elif self.path == "/index.html":
+            body = "<html><body>" + "".join(
+                f'<a href="hpaa195801_2_{i:03d}.html">第{i}節</a>' for i in range(N_PAGES)
+            ) + "</body></html>"
+        elif self.path.startswith("/hpaa195801_2_"):
+            body = f"<html><body><h1>{self.path}</h1><p>科学技術の振興について。</p></body></html>"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def start_mock(port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockWarp)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/index.html"
+
+
+def crawl_shared(index_url: str) -> dict:
+    with WarpSession() as s:
+        for url in page_links(s.get(index_url), index_url):
+            collect.html_to_text(s.get(url, referer=index_url))
+        return dict(s.stats)
+
+
+def crawl_per_page(index_url: str) -> dict:
+    total = {"http": 0, "browser": 0, "launches": 0, "consents": 0}
+    with WarpSession() as s:
+        links = page_links(s.get(index_url), index_url)
+        for k, v in s.stats.items():
+            total[k] += v
+    for url in links:
+        with WarpSession() as s:
+            collect.html_to_text(s.get(url, referer=index_url))
+            for k, v in s.stats.items():
+                total[k] += v
+    return total
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="WARP collector benchmark on a local mock site")
+    ap.add_argument("--serve", action="store_true", help="only run the mock site on PORT")
+    args = ap.parse_args()
+
+    if args.serve:
+        server, url = start_mock(PORT)
+        print("mock WARP index:", url)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    server, index_url = start_mock()
+    print(f"mock site: {index_url} ({N_PAGES} pages)\n")
+    print(f"{'mode':10s} {'sec':>7s} {'http':>5s} {'browser':>8s} {'launches':>9s} {'consents':>9s}")
+    for name, crawl in (("per-page", crawl_per_page), ("shared", crawl_shared)):
+        t0 = time.perf_counter()
+        st = crawl(index_url)
+        sec = time.perf_counter() - t0
+        print(f"{name:10s} {sec:7.2f} {st['http']:5d} {st['browser']:8d} {st['launches']:9d} {st['consents']:9d}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: trie compound merging vs naive per-term replacement.
+
+Terms are synthesised from the most frequent adjacent token n-grams in
+tokens/ so that thousands of realistic multi-morpheme terms are
+available without a hand-made list. The naive baseline rewrites the
+joined token stream once per term with str.replace.
+
+Run:
+  python -m benchmarks.bench_compounds
+"""
+
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+from compounds import CompoundTrie
+
+TOKEN_DIR = Path("tokens")
+TERM_COUNTS = [10, 100, 1000, 5000]
+NGRAM_MAX = 3
+
+
+def load_tokens() -> List[List[str]]:
+    return [
+        p.read_text(encoding="utf-8").split()
+        for p in sorted(TOKEN_DIR.glob("20*.tokens.txt"))
+    ]
+
+
+def synth_terms(corpora: List[List[str]], n_terms: int) -> List[Tuple[str, ...]]:
+    counts: Counter = Counter()
+    for toks in corpora:
+        for n in range(2, NGRAM_MAX + 1):
+            for i in range(len(toks) - n + 1):
+                gram = tuple(toks[i:i + n])
+                if all(len(t) > 1 for t in gram):
+                    counts[gram] += 1
+    return [g for g, _ in counts.most_common(n_terms)]
+
+
+def merge_naive(tokens: List[str], terms: List[Tuple[str, ...]]) -> List[str]:
+    text = " " + " ".join(tokens) + " "
+    for parts in terms:
+        text = text.replace(" " + " ".join(parts) + " ", " " + "".join(parts) + " ")
+    return text.split()
+
+
+def main() -> None:
+    corpora = load_tokens()
+    n_tokens = sum(len(t) for t in corpora)
+    print(f"corpus: {len(corpora)} years, {n_tokens} tokens")
+
+    all_terms = synth_terms(corpora, max(TERM_COUNTS))
+
+    print(f"{'terms':>6s} {'build[s]':>9s} {'trie[s]':>9s} {'naive[s]':>9s} {'speedup':>8s} {'merged':>8s}")
+    for k in TERM_COUNTS:
+        terms = all_terms[:k]
+
+        t0 = time.perf_counter()
+        trie = CompoundTrie("".join(parts) for parts in terms)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        merged = sum(len(trie.merge(toks)) for toks in corpora)
+        t_trie = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for toks in corpora:
+            merge_naive(toks, terms)
+        t_naive = time.perf_counter() - t0
+
+        print(
+            f"{k:6d} {t_build:9.3f} {t_trie:9.3f} {t_naive:9.3f} "
+            f"{t_naive / max(t_trie, 1e-9):7.1f}x {n_tokens - merged:8d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: PDF extraction backends of pdftotxt.py on corpus/pdf.
+
+For each backend in pdftotxt.BACKENDS, every PDF is extracted page by
+page (before running-head stripping) and compared with the REFERENCE
+backend on the same page:
+
+  pages/s    extraction throughput
+  chars      share of the reference's characters also produced
+             (multiset overlap, whitespace ignored; reading order ignored)
+  order      difflib ratio of the page strings (whitespace removed);
+             lower than chars when the same text comes out in another order
+  pages<0.9  pages whose order score is below 0.9
+
+Run:
+  python -m benchmarks.bench_extract
+  python -m benchmarks.bench_extract --max-pdfs 10 --backends blocks words
+"""
+
+import argparse
+import difflib
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from pdftotxt import BACKENDS, PDF_ROOT
+
+REFERENCE = "blocks"
+LOW_ORDER = 0.9
+
+WS_PAT = re.compile(r"\s+")
+
+
+def page_texts(backend: str, pdfs: List[Path]) -> Dict[str, List[str]]:
+    return {str(p): [WS_PAT.sub("", "".join(lines)) for lines in BACKENDS[backend](p)] for p in pdfs}
+
+
+def char_overlap(ref: str, other: str) -> float:
+    if not ref:
+        return 1.0 if not other else 0.0
+    a, b = Counter(ref), Counter(other)
+    return sum(min(n, b[c]) for c, n in a.items()) / max(len(ref), len(other))
+
+
+def order_ratio(ref: str, other: str) -> float:
+    if not ref and not other:
+        return 1.0
+    return difflib.SequenceMatcher(None, ref, other, autojunk=False).ratio()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compare PDF extraction backends")
+    ap.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    ap.add_argument("--max-pdfs", type=int, default=0, help="use the first N PDFs (0 = all)")
+    args = ap.parse_args()
+
+    pdfs = sorted(PDF_ROOT.rglob("*.pdf"))
+    if args.max_pdfs:
+        pdfs = pdfs[:args.max_pdfs]
+    if not pdfs:
+        raise SystemExit(f"No PDFs found under: {PDF_ROOT.resolve()}")
+
+    backends = [REFERENCE] + [b for b in args.backends if b != REFERENCE]
+    texts: Dict[str, Dict[str, List[str]]] = {}
+    print(f"{len(pdfs)} PDFs, reference = {REFERENCE}\n")
+    print(f"{'backend':10s} {'pages':>6s} {'sec':>8s} {'pages/s':>8s} {'chars':>7s} {'order':>7s} {'pages<' + str(LOW_ORDER):>10s}")
+    for backend in backends:
+        t0 = time.perf_counter()
+        texts[backend] = page_texts(backend, pdfs)
+        sec = time.perf_counter() - t0
+
+        chars, order = [], []
+        for pdf, pages in texts[backend].items():
+            ref_pages = texts[REFERENCE][pdf]
+            if len(pages) != len(ref_pages):
+                print(f"  {backend}: page count differs for {pdf} ({len(pages)} vs {len(ref_pages)})")
+            for ref, other in zip(ref_pages, pages):
+                chars.append(char_overlap(ref, other))
+                order.append(order_ratio(ref, other))
+
+        n_pages = sum(len(p) for p in texts[backend].values())
+        order_a = np.array(order)
+        print(f"{backend:10s} {n_pages:6d} {sec:8.2f} {n_pages / sec:8.1f} {np.mean(chars):7.3f} "
+              f"{order_a.mean():7.3f} {int((order_a < LOW_ORDER).sum()):10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: block ordering of pdftotxt.py ("columns" vs the previous "midline").
+
+The PyMuPDF blocks of every page under corpus/pdf are read once, then
+each layout orders all pages REPEAT times, so the timings cover the
+layout step alone (block filtering, ordering, splitting into lines):
+
+  pages/s    ordering throughput
+  same       pages where both layouts give the same line order
+  order      mean difflib ratio of the two page strings (whitespace removed)
+
+and, for "columns", how many pages have a band of 2 / 3+ columns (sidebars
+included), spanning boxes between multi-column bands, or sidebar boxes read
+after the main flow. Small synthetic pages with a known reading order
+(SYNTHETIC) are checked first.
+
+Run:
+  python -m benchmarks.bench_layout
+  python -m benchmarks.bench_layout --max-pdfs 10 --repeat 5
+"""
+
+import argparse
+import difflib
+import re
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+import pdftotxt
+from pdftotxt import PDF_ROOT, blocks_to_lines, page_columns, page_layout
+
+WS_PAT = re.compile(r"\s+")
+
+# (name, blocks, page width); block texts are numbered in reading order
+SYNTHETIC = [
+    ("two columns", [(50, 60, 290, 100, "1"), (310, 60, 550, 100, "3"),
+                     (50, 110, 290, 200, "2"), (310, 110, 550, 200, "4")], 600),
+    ("spanning heading", [(50, 20, 550, 40, "1"), (50, 60, 290, 100, "2"), (310, 60, 550, 100, "4"),
+                          (50, 110, 290, 200, "3"), (310, 110, 550, 200, "5")], 600),
+    # negative y0 (unusual mediaboxes, pdfminer's flipped coordinates)
+    ("negative y0", [(50, -5, 290, 100, "1"), (310, -5, 550, 100, "3"),
+                     (50, 110, 290, 200, "2"), (310, 110, 550, 200, "4")], 600),
+]
+
+
+def check_synthetic() -> None:
+    pdftotxt.LAYOUT = "columns"
+    for name, blocks, width in SYNTHETIC:
+        got = blocks_to_lines(blocks, width)
+        want = sorted(got, key=int)
+        print(f"  {name:18s} {'ok' if got == want else 'WRONG ' + ' '.join(got)}")
+
+
+def load_pages(pdfs: List[Path]) -> List[Tuple[list, float]]:
+    import fitz  # PyMuPDF
+
+    pages = []
+    for p in pdfs:
+        with fitz.open(p) as doc:
+            for page in doc:
+                pages.append((page.get_text("blocks"), page.rect.width))
+    return pages
+
+
+def run(layout: str, pages: List[Tuple[list, float]], repeat: int) -> Tuple[float, List[List[str]]]:
+    pdftotxt.LAYOUT = layout
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [blocks_to_lines(blocks, width) for blocks, width in pages]
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def has_sidebar(col: np.ndarray) -> bool:
+    # sidebar columns are keyed after all main columns (col + n_cols)
+    return len(col) > 0 and int(col.max()) >= len(np.unique(col))
+
+
+def layout_counts(pages: List[Tuple[list, float]]) -> dict:
+    counts = {"2 columns": 0, "3+ columns": 0, "spanning": 0, "sidebar": 0}
+    for blocks, width in pages:
+        boxes = [b for b in blocks if len(b) >= 5 and isinstance(b[4], str) and b[4].strip()]
+        if len(boxes) < 2:
+            continue
+        xy = np.array([b[:4] for b in boxes], dtype=np.float64)
+        zeros = np.zeros(len(xy), dtype=np.int64)
+        _, region, _ = page_columns(xy, zeros.astype(bool), zeros, width, gutter_frac=0.0)
+        band, col, spanning = page_layout(xy, width)
+
+        body_band, body_col = band[~spanning], col[~spanning]
+        widest = max((len(np.unique(body_col[body_band == b])) for b in np.unique(body_band)), default=1)
+        counts["2 columns"] += widest == 2
+        counts["3+ columns"] += widest >= 3
+        counts["spanning"] += bool(spanning.any()) and widest >= 2
+        counts["sidebar"] += has_sidebar(region) or has_sidebar(body_col)
+    return counts
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compare block ordering layouts")
+    ap.add_argument("--max-pdfs", type=int, default=0, help="use the first N PDFs (0 = all)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print("synthetic pages (columns):")
+    check_synthetic()
+    print()
+
+    pdfs = sorted(PDF_ROOT.rglob("*.pdf"))
+    if args.max_pdfs:
+        pdfs = pdfs[:args.max_pdfs]
+    if not pdfs:
+        raise SystemExit(f"No PDFs found under: {PDF_ROOT.resolve()}")
+
+    pages = load_pages(pdfs)
+    n_blocks = sum(len(b) for b, _ in pages)
+    print(f"{len(pdfs)} PDFs, {len(pages)} pages, {n_blocks} blocks (best of {args.repeat})\n")
+
+    old_sec, old = run("midline", pages, args.repeat)
+    new_sec, new = run("columns", pages, args.repeat)
+    pdftotxt.LAYOUT = "columns"
+
+    same = sum(a == b for a, b in zip(old, new))
+    ratios = [
+        difflib.SequenceMatcher(None, WS_PAT.sub("", "".join(a)), WS_PAT.sub("", "".join(b)), autojunk=False).ratio()
+        for a, b in zip(old, new) if a != b
+    ]
+    print(f"{'layout':8s} {'sec':>8s} {'pages/s':>9s}")
+    print(f"{'midline':8s} {old_sec:8.3f} {len(pages) / old_sec:9.0f}")
+    print(f"{'columns':8s} {new_sec:8.3f} {len(pages) / new_sec:9.0f}")
+    print(f"\nsame order: {same}/{len(pages)} pages; "
+          f"order ratio on the others: {np.mean(ratios) if ratios else 1.0:.3f}")
+
+    print("\ncolumns layout, pages with:")
+    for k, v in layout_counts(pages).items():
+        print(f"  {k:12s} {v}")
+
+
+if __name__ == "__main__":
+    main()
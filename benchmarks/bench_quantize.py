@@ -0,0 +1,72 @@
+"""
+Benchmark: quantized vector stores vs float32.
+
+Exports the year models in every dtype of vectors.py to a temporary
+directory and reports, per dtype:
+
+  size       bytes of the stored arrays (vectors + ids + scales), next to
+             the size of models/ (full gensim training state)
+  query      mean time of one top-TOPN neighbour query
+  overlap    mean |top-TOPN ∩ float32 top-TOPN| / TOPN
+  top1       share of queries whose first neighbour matches float32
+  max|Δsim|  largest similarity difference over the returned neighbours
+
+Queries: the N_QUERIES most frequent words of every year.
+
+Run:
+  python -m benchmarks.bench_quantize
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import vectors
+from vectors import DTYPES, VectorStore
+
+N_QUERIES = 200
+TOPN = 15
+
+
+def run_queries(store: VectorStore) -> Tuple[Dict[Tuple[str, str], List[Tuple[str, float]]], float]:
+    results = {}
+    t0 = time.perf_counter()
+    for year in store.names:
+        yv = store[year]
+        for w in yv.words[:N_QUERIES]:
+            results[year, w] = yv.neighbors(w, TOPN)
+    return results, (time.perf_counter() - t0) / max(len(results), 1)
+
+
+def main() -> None:
+    model_bytes = sum(p.stat().st_size for p in vectors.MODEL_DIR.glob(vectors.MODEL_GLOB + "*"))
+    print(f"models/{vectors.MODEL_GLOB}: {model_bytes / 1e6:.1f} MB (training state)\n")
+    print(f"{'dtype':8s} {'size[MB]':>9s} {'vs f32':>7s} {'query[ms]':>10s} {'overlap':>8s} {'top1':>6s} {'max|Δsim|':>10s}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        base: Dict = {}
+        base_bytes = 0
+        for dtype in DTYPES:
+            vectors.export(vectors.MODEL_DIR, out_dir, dtype=dtype)
+            store = VectorStore(out_dir, dtype=dtype)
+            results, per_query = run_queries(store)
+            if dtype == "float32":
+                base, base_bytes = results, store.nbytes
+
+            overlap, top1, dsim = [], [], 0.0
+            for key, res in results.items():
+                ref = dict(base[key])
+                overlap.append(len(ref.keys() & {w for w, _ in res}) / TOPN)
+                top1.append(res[0][0] == base[key][0][0])
+                dsim = max([dsim] + [abs(s - ref[w]) for w, s in res if w in ref])
+
+            print(f"{dtype:8s} {store.nbytes / 1e6:9.2f} {store.nbytes / base_bytes:7.2f} {per_query * 1000:10.3f} "
+                  f"{np.mean(overlap):8.3f} {np.mean(top1):6.3f} {dsim:10.4f}")
+
+
+if __name__ == "__main__":
+    main()
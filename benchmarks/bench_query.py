@@ -0,0 +1,78 @@
+"""
+Benchmark: query latency of the resident service vs reloading models.
+
+  reload   what print_neighbors.py pays per invocation: Word2Vec.load of
+           every year model + most_similar
+  cold     first HTTP /neighbors request (all years) for each query word
+  warm     the same requests again (served from the LRU cache)
+
+The server runs in-process on a free port; requests go through urllib.
+
+Run:
+  python -m benchmarks.bench_query
+"""
+
+import json
+import threading
+import time
+from typing import List
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import numpy as np
+
+import vectors
+from query_server import QueryService, make_server
+from vectors import VectorStore
+
+N_QUERIES = 200
+TOPN = 15
+
+
+def latencies(base: str, words: List[str]) -> np.ndarray:
+    out = []
+    for w in words:
+        t0 = time.perf_counter()
+        with urlopen(f"{base}/neighbors?word={quote(w)}&topn={TOPN}") as r:
+            json.loads(r.read())
+        out.append(time.perf_counter() - t0)
+    return np.array(out) * 1000
+
+
+def row(label: str, ms: np.ndarray) -> None:
+    print(f"{label:10s} {len(ms):6d} {ms.mean():9.2f} {np.percentile(ms, 50):9.2f} {np.percentile(ms, 95):9.2f}")
+
+
+def main() -> None:
+    from gensim.models import Word2Vec
+
+    vectors.export()
+
+    t0 = time.perf_counter()
+    store = VectorStore()
+    t_open = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for path in sorted(vectors.MODEL_DIR.glob(vectors.MODEL_GLOB)):
+        wv = Word2Vec.load(str(path)).wv
+        if "科学" in wv:
+            wv.most_similar("科学", topn=TOPN)
+    t_reload = (time.perf_counter() - t0) * 1000
+
+    words = store[store.names[-1]].words[:N_QUERIES]
+    server = make_server(QueryService(store), "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"{len(store.names)} years, store opened in {t_open * 1000:.1f} ms\n")
+    print(f"{'':10s} {'n':>6s} {'mean[ms]':>9s} {'p50[ms]':>9s} {'p95[ms]':>9s}")
+    row("reload", np.array([t_reload]))
+    row("cold", latencies(base, words))
+    row("warm", latencies(base, words))
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark: CLI startup time vs importing the heavy dependency stacks.
+
+Each command runs in a fresh interpreter; the best of REPEAT runs is shown.
+
+Run:
+  python -m benchmarks.bench_startup
+"""
+
+import subprocess
+import sys
+import time
+from typing import List
+
+from pipeline import STAGES
+
+REPEAT = 3
+
+HEAVY_IMPORTS = ["fitz", "sudachipy.dictionary", "gensim.models", "sklearn.decomposition", "umap"]
+
+
+def best_of(cmd: List[str], repeat: int = REPEAT) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    py = sys.executable
+
+    print(f"{'command':40s} {'best[s]':>8s}")
+    print(f"{'python -c pass':40s} {best_of([py, '-c', 'pass']):8.3f}")
+    for name in STAGES:
+        t = best_of([py, "-m", "pipeline", name, "--help"])
+        print(f"{'pipeline ' + name + ' --help':40s} {t:8.3f}")
+    for mod in HEAVY_IMPORTS:
+        t = best_of([py, "-W", "ignore", "-c", f"import {mod}"], repeat=1)
+        print(f"{'import ' + mod:40s} {t:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
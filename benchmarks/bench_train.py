@@ -0,0 +1,59 @@
+"""
+Benchmark: Word2Vec training throughput, Python iterable vs corpus_file.
+
+Trains on all years of tokens/ (one LineSentence file, same sentence
+splitting for both paths) with the settings of train_word2vec_yearly.py
+for each worker count and reports raw words/s:
+
+  iterable     sentences from TokenStream (Python; the GIL serialises
+               reading and job dispatch)
+  corpus_file  gensim reads the LineSentence file in its Cython workers
+
+Run:
+  python -m benchmarks.bench_train
+  python -m benchmarks.bench_train --workers 1 2 4 8 --epochs 2
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import train_word2vec_yearly as tw
+from train_word2vec_yearly import TokenStream, new_model, write_corpus
+
+WORKERS = [1, 2, 4]
+EPOCHS = 1
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Word2Vec words/s: iterable vs corpus_file")
+    ap.add_argument("--workers", nargs="+", type=int, default=WORKERS)
+    ap.add_argument("--epochs", type=int, default=EPOCHS)
+    args = ap.parse_args()
+
+    files = sorted(tw.TOKEN_DIR.glob("20*.tokens.txt"))
+    stream = TokenStream(files)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "corpus.txt"
+        n_words = write_corpus(stream, corpus)
+        print(f"{len(files)} years, {n_words} words, {args.epochs} epoch(s), {os.cpu_count()} CPUs\n")
+        print(f"{'workers':>7s} {'iterable w/s':>14s} {'corpus_file w/s':>16s} {'speedup':>8s}")
+
+        for w in args.workers:
+            tw.WORKERS = w
+            rates = []
+            for kw in ({"corpus_iterable": stream}, {"corpus_file": str(corpus)}):
+                model = new_model()
+                model.build_vocab(**kw)
+                t0 = time.perf_counter()
+                _, raw = model.train(**kw, total_examples=model.corpus_count,
+                                     total_words=model.corpus_total_words, epochs=args.epochs)
+                rates.append(raw / (time.perf_counter() - t0))
+            print(f"{w:7d} {rates[0]:14.0f} {rates[1]:16.0f} {rates[1] / rates[0]:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
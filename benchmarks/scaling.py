@@ -0,0 +1,266 @@
+"""
+Scaling benchmark over synthetic Japanese-like corpora
+
+Generates a synthetic corpus at several multiples of the real corpus size
+(BASE_PAGES pages of about PAGE_CHARS characters each; ~2000 pages is the
+2017-2025 corpus) and times every pipeline stage on it:
+
+  pdf          extract_pdf_to_text on generated multi-page PDFs (PyMuPDF)
+  clean        clean_text
+  norm         normalize_breaks
+  dedup        MinHash signatures + LSH over the normalised paragraphs
+  chunk        iter_chunks_by_paragraph
+  tokenise     tokenise_to_file (Sudachi)
+  train        Word2Vec (BENCH_EPOCHS epochs)
+  neighbors    most_similar for N_QUERIES frequent words
+
+Synthetic text: Zipf-distributed kanji/katakana "content words" joined by
+particles into sentences, wrapped into PDF-like lines, with page/source
+markers and a share of number-heavy table lines so clean_text has work.
+
+For each stage the table shows seconds per scale and the log-log slope
+between consecutive scales (1.0 = linear); slopes above SLOPE_WARN are
+flagged. Timings are also written as a run report under reports/.
+
+Run:
+  python -m benchmarks.scaling                        # 1x, 10x, 100x, all stages
+  python -m benchmarks.scaling --scales 0.1 1 --stages clean norm chunk tokenise
+"""
+
+import argparse
+import math
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from dedup import MIN_CHARS, find_duplicates, minhash_signatures
+from instrument import RunReport
+from norm import normalize_breaks
+from pdftotxt import clean_text, extract_pdf_to_text
+from tokenise import get_split_mode, iter_chunks_by_paragraph, tokenise_to_file
+
+# -------------------------
+# Config
+# -------------------------
+SCALES = [1, 10, 100]
+STAGES = ["pdf", "clean", "norm", "dedup", "chunk", "tokenise", "train", "neighbors"]
+
+BASE_PAGES = 2000
+PAGE_CHARS = 1100
+LINE_CHARS = 38
+PAGES_PER_PDF = 100
+
+VOCAB_SIZE = 20000
+ZIPF_A = 1.1
+TABLE_LINE_RATE = 0.05
+
+BENCH_EPOCHS = 1
+N_QUERIES = 200
+SLOPE_WARN = 1.15
+SEED = 0
+
+KANJI = (
+    "科学技術研究開発推進国際社会基盤人材育成創出産業政策計画実施機関大学企業"
+    "情報通信環境安全医療生命宇宙海洋防災地域連携支援制度強化成果活用展開分野"
+    "知識価値未来課題解決戦略評価基本施策予算事業整備促進新規重要総合拠点"
+)
+KATAKANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモラリルレロン"
+PARTICLES = ["の", "に", "を", "は", "が", "と", "で", "や", "、", "について", "による"]
+
+
+# -------------------------
+# Synthetic text
+# -------------------------
+def make_vocab(rng: np.random.Generator, size: int = VOCAB_SIZE) -> List[str]:
+    words = set()
+    while len(words) < size:
+        if rng.random() < 0.8:
+            n = int(rng.integers(2, 5))
+            words.add("".join(rng.choice(list(KANJI), n)))
+        else:
+            n = int(rng.integers(3, 7))
+            words.add("".join(rng.choice(list(KATAKANA), n)))
+    return sorted(words)
+
+
+class SynthText:
+    def __init__(self, seed: int = SEED) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.vocab = make_vocab(self.rng)
+
+    def sentence(self) -> str:
+        n = int(self.rng.integers(4, 14))
+        ids = np.minimum(self.rng.zipf(ZIPF_A, n), len(self.vocab)) - 1
+        parts = self.rng.choice(PARTICLES, n)
+        return "".join(self.vocab[i] + p for i, p in zip(ids, parts)) + "する。"
+
+    def page_lines(self) -> List[str]:
+        body: List[str] = []
+        size = 0
+        while size < PAGE_CHARS:
+            para = "".join(self.sentence() for _ in range(int(self.rng.integers(2, 6))))
+            size += len(para)
+            body.extend(para[i:i + LINE_CHARS] for i in range(0, len(para), LINE_CHARS))
+            if self.rng.random() < TABLE_LINE_RATE * 4:
+                body.append(" ".join(str(int(x)) for x in self.rng.integers(0, 10000, 6)))
+            body.append("")
+        return body
+
+    def pages(self, n_pages: int) -> Iterator[List[str]]:
+        for _ in range(n_pages):
+            yield self.page_lines()
+
+    def corpus_text(self, n_pages: int) -> str:
+        out: List[str] = []
+        for i, lines in enumerate(self.pages(n_pages)):
+            if i % PAGES_PER_PDF == 0:
+                out.append(f"### SOURCE: synth_{i // PAGES_PER_PDF:04d}.pdf ###")
+            out.append(f"## PAGE {i % PAGES_PER_PDF + 1} ##")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+def write_pdfs(synth: SynthText, n_pages: int, out_dir: Path) -> List[Path]:
+    """
+    Multi-page PDFs; every other page is laid out in two columns.
+    """
+    import fitz
+
+    paths: List[Path] = []
+    doc = None
+    for i, lines in enumerate(synth.pages(n_pages)):
+        if i % PAGES_PER_PDF == 0:
+            if doc is not None:
+                paths.append(out_dir / f"synth_{len(paths):04d}.pdf")
+                doc.save(paths[-1])
+            doc = fitz.open()
+        page = doc.new_page(width=595, height=842)
+        text = "\n".join(lines)
+        if i % 2:
+            half = len(text) // 2
+            page.insert_textbox(fitz.Rect(40, 40, 290, 800), text[:half], fontname="japan", fontsize=8)
+            page.insert_textbox(fitz.Rect(305, 40, 555, 800), text[half:], fontname="japan", fontsize=8)
+        else:
+            page.insert_textbox(fitz.Rect(40, 40, 555, 800), text, fontname="japan", fontsize=9)
+    if doc is not None:
+        paths.append(out_dir / f"synth_{len(paths):04d}.pdf")
+        doc.save(paths[-1])
+    return paths
+
+
+# -------------------------
+# Stages
+# -------------------------
+def run_scale(scale: float, stages: List[str], report: RunReport, work: Path) -> None:
+    n_pages = max(1, int(BASE_PAGES * scale))
+    label = f"x{scale:g}"
+    synth = SynthText()
+    text = synth.corpus_text(n_pages)
+    n_bytes = len(text.encode("utf-8"))
+    print(f"\n=== {label}: {n_pages} pages, {n_bytes / 1e6:.1f} MB ===")
+
+    if "pdf" in stages:
+        pdf_dir = work / f"pdf_{label}"
+        pdf_dir.mkdir()
+        pdfs = write_pdfs(SynthText(), n_pages, pdf_dir)
+        with report.stage("pdf", label) as st:
+            for p in pdfs:
+                extract_pdf_to_text(p)
+            st.add(pages=n_pages)
+
+    if "clean" in stages:
+        with report.stage("clean", label) as st:
+            text = clean_text(text)
+            st.add(bytes=n_bytes)
+
+    normed = text
+    if "norm" in stages:
+        with report.stage("norm", label) as st:
+            normed = normalize_breaks(text)
+            st.add(bytes=n_bytes)
+
+    if "dedup" in stages:
+        paras = [ln for ln in normed.splitlines() if len(ln) >= MIN_CHARS]
+        with report.stage("dedup", label) as st:
+            find_duplicates(minhash_signatures(paras))
+            st.add(paragraphs=len(paras))
+
+    if "chunk" in stages:
+        with report.stage("chunk", label) as st:
+            n = sum(1 for _ in iter_chunks_by_paragraph(text))
+            st.add(bytes=n_bytes, chunks=n)
+
+    if not any(s in stages for s in ("tokenise", "train", "neighbors")):
+        return
+
+    from sudachipy import dictionary
+
+    tok_path = work / f"{label}.tokens.txt"
+    tokenizer = dictionary.Dictionary().create()
+    with report.stage("tokenise", label) as st:
+        n_tokens = tokenise_to_file(text, tok_path, tokenizer)
+        st.add(bytes=n_bytes, tokens=n_tokens)
+    if "tokenise" not in stages:
+        report.stages.pop()
+
+    if not any(s in stages for s in ("train", "neighbors")):
+        return
+
+    from gensim.models import Word2Vec
+
+    toks = tok_path.read_text(encoding="utf-8").split()
+    sentences = [toks[i:i + 1000] for i in range(0, len(toks), 1000)]
+    with report.stage("train", label) as st:
+        model = Word2Vec(sentences, vector_size=200, window=5, min_count=5, sg=1, epochs=BENCH_EPOCHS, workers=4)
+        st.add(words=model.corpus_total_words * BENCH_EPOCHS)
+    if "train" not in stages:
+        report.stages.pop()
+
+    if "neighbors" in stages:
+        queries = model.wv.index_to_key[:N_QUERIES]
+        with report.stage("neighbors", label) as st:
+            for w in queries:
+                model.wv.most_similar(w, topn=15)
+            st.add(queries=len(queries))
+
+
+# -------------------------
+# Report
+# -------------------------
+def print_curves(report: RunReport, scales: List[float]) -> None:
+    by_stage: Dict[str, Dict[str, float]] = {}
+    for rec in report.stages:
+        by_stage.setdefault(rec.name, {})[rec.year] = rec.wall
+
+    labels = [f"x{s:g}" for s in scales]
+    print("\n" + f"{'stage':10s}" + "".join(f"{l:>10s}" for l in labels) + "   slopes")
+    for name, times in by_stage.items():
+        row = f"{name:10s}" + "".join(f"{times.get(l, float('nan')):10.2f}" for l in labels)
+        slopes = []
+        for (s0, l0), (s1, l1) in zip(zip(scales, labels), zip(scales[1:], labels[1:])):
+            if l0 in times and l1 in times and times[l0] > 0:
+                k = math.log(times[l1] / times[l0]) / math.log(s1 / s0)
+                slopes.append(f"{k:.2f}" + ("!" if k > SLOPE_WARN else ""))
+        print(row + "   " + " ".join(slopes))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Pipeline scaling benchmark on synthetic corpora")
+    ap.add_argument("--scales", nargs="+", type=float, default=SCALES)
+    ap.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    args = ap.parse_args()
+
+    scales = sorted(args.scales)
+    report = RunReport("bench_scaling")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            run_scale(scale, args.stages, report, Path(tmp))
+
+    print_curves(report, scales)
+    report.save()
+
+
+if __name__ == "__main__":
+    main()
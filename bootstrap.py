@@ -0,0 +1,439 @@
+"""
+Bootstrap confidence intervals for target-word similarities and neighbour ranks
+
+Input:
+  ./tokens/[year].tokens.txt (+ [year].prov.json if present)
+Output (./bootstrap/):
+  cache/[year]/[key]/units.npz     the year's token ids grouped into units
+                     vocab.txt     the year's vocabulary (count >= MIN_COUNT)
+                     full.npy      similarities of TARGETS to every word,
+                                   trained on the unresampled year
+                     rep_NNNN.npy  the same for bootstrap replicate NNNN
+  report.tsv         per year, target and probe word: full-sample
+                     similarity and rank, bootstrap mean and CI of the
+                     similarity, median and CI of the rank, and the share
+                     of replicates with the word in the top TOPN
+
+Each replicate resamples the year's units (UNIT = line, paragraph, page
+or document) with replacement and retrains a light model on them:
+  ppmi   windowed co-occurrence counts -> PPMI (context smoothing 0.75)
+         -> randomized SVD; count-based, about a second per year
+  w2v    a small skip-gram Word2Vec (W2V_SIZE dims, W2V_EPOCHS epochs)
+Replicates run in a process pool, one chunk of replicates per task.
+
+The cache directory key covers the token file, UNIT, METHOD and the model
+parameters, and replicate i is always drawn with seed (SEED, i). Raising
+REPLICATES only computes the missing replicates and the report is
+recomputed over all of them, so a 100-replicate run extended to 200 gives
+the same result as a fresh 200-replicate run.
+
+Probe words for each target are the union over years of the target's
+full-sample top TOPN, so every year reports the same words and
+year-to-year differences can be read against their intervals.
+
+Run:
+  python bootstrap.py
+  python bootstrap.py --replicates 200 --unit page --method w2v --years 2019 2020
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from norm import SENT_END
+from provenance import Provenance
+
+
+# -------------------------
+# Config
+# -------------------------
+TOKEN_DIR = Path("tokens")
+OUT_DIR = Path("bootstrap")
+CACHE_DIR = OUT_DIR / "cache"
+TARGETS = ["科学", "イノベーション"]
+YEARS: List[str] = []           # empty: all years in TOKEN_DIR
+
+UNITS = ("line", "paragraph", "page", "document")
+UNIT = "paragraph"
+METHODS = ("ppmi", "w2v")
+METHOD = "ppmi"
+REPLICATES = 100
+WORKERS = min(4, os.cpu_count() or 1)
+SEED = 42
+
+MIN_COUNT = 5
+WINDOW = 5
+TOPN = 15
+CI = 0.95
+
+# ppmi
+SVD_DIM = 100
+CDS_ALPHA = 0.75
+
+# w2v
+W2V_SIZE = 100
+W2V_EPOCHS = 5
+
+
+class Params(NamedTuple):
+    """
+    Everything a replicate depends on; passed to the pool workers explicitly
+    (module globals set by pipeline.py or __main__ are not seen by spawned
+    workers).
+    """
+    targets: Tuple[str, ...]
+    unit: str
+    method: str
+    seed: int
+    min_count: int
+    window: int
+    svd_dim: int
+    cds_alpha: float
+    w2v_size: int
+    w2v_epochs: int
+
+
+def current_params() -> Params:
+    return Params(tuple(TARGETS), UNIT, METHOD, SEED, MIN_COUNT, WINDOW, SVD_DIM, CDS_ALPHA, W2V_SIZE, W2V_EPOCHS)
+
+
+# -------------------------
+# Units
+# -------------------------
+def read_units(path: Path, unit: str = UNIT) -> List[List[str]]:
+    """
+    The year's tokens grouped into resampling units, in file order.
+    Lines of the token file are the PDF layout lines of txt_clean (Sudachi
+    keeps the line breaks). A paragraph joins lines as norm.py does: it
+    ends after a line whose last character is in SENT_END, at a blank line
+    and at a page boundary. Pages and documents come from the provenance
+    sidecar, or from the SOURCE/PAGE marker lines that older token files
+    carry in the stream (those lines are dropped).
+    """
+    prov = Provenance.for_tokens(path)
+    groups: Dict[object, List[str]] = {}
+    pos, src, page = 0, -1, 0
+    para, closed, prev = 0, True, None
+    for i, line in enumerate(path.read_text(encoding="utf-8").split("\n")):
+        toks = line.split()
+        if not toks:
+            closed = True
+            continue
+        if toks[:4] == ["#", "#", "#", "SOURCE"]:
+            src, page = src + 1, 0
+        elif toks[:3] == ["#", "#", "PAGE"]:
+            page += 1
+        else:
+            if prov is not None:
+                where = prov.locate(pos)
+            else:
+                where = (src, page)
+            if closed or where != prev:
+                para += 1
+            closed, prev = toks[-1][-1] in SENT_END, where
+            key = {"line": i, "paragraph": para, "page": where}.get(unit, where[0])
+            groups.setdefault(key, []).extend(toks)
+        pos += len(toks)
+    return list(groups.values())
+
+
+def encode_units(units: List[List[str]], min_count: int = MIN_COUNT) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    (vocab, ids, offsets): tokens with count >= min_count as int32 ids, all
+    units concatenated; unit u is ids[offsets[u]:offsets[u + 1]].
+    """
+    from collections import Counter
+
+    counts = Counter(t for u in units for t in u)
+    itos = sorted((w for w, c in counts.items() if c >= min_count), key=lambda w: (-counts[w], w))
+    stoi = {w: i for i, w in enumerate(itos)}
+    parts = [np.array([stoi[t] for t in u if t in stoi], dtype=np.int32) for u in units]
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in parts])
+    return itos, np.concatenate(parts) if parts else np.zeros(0, np.int32), offsets
+
+
+def resample(ids: np.ndarray, offsets: np.ndarray, rng: Optional[np.random.Generator]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Units drawn with replacement (all units, in order, if rng is None).
+    Returns the concatenated ids and a unit number per token.
+    """
+    n_units = len(offsets) - 1
+    pick = np.arange(n_units) if rng is None else rng.integers(0, n_units, n_units)
+    lens = offsets[pick + 1] - offsets[pick]
+    # gather index: offsets[pick] repeated, plus position within the unit
+    starts = np.repeat(offsets[pick] - np.concatenate([[0], np.cumsum(lens)[:-1]]), lens)
+    idx = starts + np.arange(lens.sum())
+    return ids[idx], np.repeat(np.arange(len(pick)), lens)
+
+
+# -------------------------
+# Models
+# -------------------------
+def ppmi_vectors(ids: np.ndarray, unit_of: np.ndarray, n: int, params: Params, seed: int) -> np.ndarray:
+    from scipy.sparse import coo_matrix
+    from sklearn.utils.extmath import randomized_svd
+
+    rows, cols = [], []
+    for d in range(1, params.window + 1):
+        same = unit_of[:-d] == unit_of[d:]
+        rows.append(ids[:-d][same])
+        cols.append(ids[d:][same])
+    r, c = np.concatenate(rows), np.concatenate(cols)
+    counts = coo_matrix((np.ones(len(r), np.float32), (r, c)), shape=(n, n)).tocsr()
+    counts = (counts + counts.T).tocoo()
+
+    row_sum = np.asarray(counts.sum(axis=1)).ravel()
+    ctx = np.asarray(counts.sum(axis=0)).ravel() ** params.cds_alpha
+    pmi = np.log(counts.data * ctx.sum() / (row_sum[counts.row] * ctx[counts.col]))
+    keep = pmi > 0
+    m = coo_matrix((pmi[keep], (counts.row[keep], counts.col[keep])), shape=(n, n)).tocsr()
+
+    dim = min(params.svd_dim, n - 1)
+    u, s, _ = randomized_svd(m, dim, random_state=seed)
+    return u * np.sqrt(s)
+
+
+def w2v_vectors(ids: np.ndarray, unit_of: np.ndarray, itos: List[str], params: Params, seed: int) -> np.ndarray:
+    from gensim.models import Word2Vec
+
+    from tokenise import MAX_SENTENCE_LEN
+
+    cuts = np.flatnonzero(np.diff(unit_of)) + 1
+    sentences = []
+    for unit in np.split(ids, cuts):
+        for s in range(0, len(unit), MAX_SENTENCE_LEN):
+            sentences.append([itos[i] for i in unit[s:s + MAX_SENTENCE_LEN]])
+
+    freq = np.bincount(ids, minlength=len(itos))
+    model = Word2Vec(vector_size=params.w2v_size, window=params.window, min_count=1, sg=1, workers=1, seed=seed)
+    model.build_vocab_from_freq({itos[i]: int(c) for i, c in enumerate(freq) if c > 0})
+    model.train(sentences, total_words=int(freq.sum()), epochs=params.w2v_epochs)
+
+    out = np.zeros((len(itos), params.w2v_size), dtype=np.float32)
+    rows = [model.wv.key_to_index[w] for w in itos if w in model.wv.key_to_index]
+    out[[i for i, w in enumerate(itos) if w in model.wv.key_to_index]] = model.wv.vectors[rows]
+    return out
+
+
+def target_sims(ids: np.ndarray, unit_of: np.ndarray, itos: List[str], params: Params, seed: int) -> np.ndarray:
+    """
+    (len(params.targets), len(itos)) cosine similarities; NaN for words
+    absent from the sample, and a NaN row for an absent target.
+    """
+    n = len(itos)
+    if params.method == "w2v":
+        vecs = w2v_vectors(ids, unit_of, itos, params, seed)
+    else:
+        vecs = ppmi_vectors(ids, unit_of, n, params, seed)
+    vecs = vecs / np.maximum(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12)
+
+    present = np.bincount(ids, minlength=n) > 0
+    stoi = {w: i for i, w in enumerate(itos)}
+    out = np.full((len(params.targets), n), np.nan, dtype=np.float32)
+    for k, t in enumerate(params.targets):
+        i = stoi.get(t)
+        if i is not None and present[i]:
+            out[k] = vecs @ vecs[i]
+            out[k, ~present] = np.nan
+    return out
+
+
+# -------------------------
+# Cache
+# -------------------------
+def cache_dir(path: Path, params: Params) -> Path:
+    st = path.stat()
+    p = params
+    model = (p.svd_dim, p.cds_alpha) if p.method == "ppmi" else (p.w2v_size, p.w2v_epochs)
+    # "v2": paragraphs are sentence-end joins (they were token-file lines before)
+    key = [path.name, str(st.st_size), str(st.st_mtime_ns), "v2", p.unit, p.method, str(p.min_count), str(p.window),
+           *map(str, model), str(p.seed), *p.targets]
+    h = hashlib.sha1("\x1f".join(key).encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / path.name.split(".")[0] / h
+
+
+def rep_path(cdir: Path, rep: int) -> Path:
+    return cdir / ("full.npy" if rep < 0 else f"rep_{rep:04d}.npy")
+
+
+def prepare(path: Path, params: Params) -> Path:
+    """
+    Cache directory of the year, with its encoded units.
+    """
+    cdir = cache_dir(path, params)
+    if not (cdir / "units.npz").exists():
+        cdir.mkdir(parents=True, exist_ok=True)
+        itos, ids, offsets = encode_units(read_units(path, params.unit), params.min_count)
+        (cdir / "vocab.txt").write_text("\n".join(itos) + "\n", encoding="utf-8")
+        np.savez(cdir / "units.npz", ids=ids, offsets=offsets)
+    return cdir
+
+
+def load_vocab(cdir: Path) -> List[str]:
+    return (cdir / "vocab.txt").read_text(encoding="utf-8").splitlines()
+
+
+def run_replicates(cdir: Path, reps: List[int], params: Params) -> int:
+    """
+    Worker: compute and save replicates (-1 = the full sample).
+    """
+    itos = load_vocab(cdir)
+    data = np.load(cdir / "units.npz")
+    ids, offsets = data["ids"], data["offsets"]
+    for rep in reps:
+        rng = None if rep < 0 else np.random.default_rng([params.seed, rep])
+        sample, unit_of = resample(ids, offsets, rng)
+        sims = target_sims(sample, unit_of, itos, params, params.seed + max(rep, 0))
+        np.save(rep_path(cdir, rep), sims)
+    return len(reps)
+
+
+def chunks(items: List[int], n: int) -> List[List[int]]:
+    return [items[i::n] for i in range(n) if items[i::n]]
+
+
+# -------------------------
+# Statistics
+# -------------------------
+def ranks(sims: np.ndarray, target: int, words: np.ndarray) -> np.ndarray:
+    """
+    (replicates, words) rank of each word among the target's neighbours
+    (1 = nearest); NaN where the word or target is absent.
+    """
+    s = sims.copy()
+    s[:, target] = np.nan
+    w = s[:, words]
+    with np.errstate(invalid="ignore"):
+        r = 1 + (s[:, None, :] > w[:, :, None]).sum(axis=2).astype(np.float64)
+    r[np.isnan(w)] = np.nan
+    return r
+
+
+def year_stats(cdir: Path, probes: Dict[str, List[str]], n_reps: int) -> List[Dict[str, object]]:
+    """
+    One record per (target, probe word) present in the year.
+    """
+    itos = load_vocab(cdir)
+    stoi = {w: i for i, w in enumerate(itos)}
+    full = np.load(rep_path(cdir, -1))
+    boot = np.stack([np.load(rep_path(cdir, r)) for r in range(n_reps)])
+    lo, hi = 50 * (1 - CI), 50 * (1 + CI)
+
+    records: List[Dict[str, object]] = []
+    for k, t in enumerate(TARGETS):
+        if t not in stoi or np.isnan(full[k]).all():
+            continue
+        words = [w for w in probes.get(t, []) if w in stoi]
+        if not words:
+            continue
+        cols = np.array([stoi[w] for w in words])
+        sim_b = boot[:, k, cols].astype(np.float64)
+        rank_b = ranks(boot[:, k], stoi[t], cols)
+        rank_f = ranks(full[k][None], stoi[t], cols)[0]
+        with np.errstate(invalid="ignore"):
+            cols_stats = {
+                "sim": full[k, cols],
+                "rank": rank_f,
+                "sim_mean": np.nanmean(sim_b, axis=0),
+                "sim_lo": np.nanpercentile(sim_b, lo, axis=0),
+                "sim_hi": np.nanpercentile(sim_b, hi, axis=0),
+                "rank_median": np.nanmedian(rank_b, axis=0),
+                "rank_lo": np.nanpercentile(rank_b, lo, axis=0),
+                "rank_hi": np.nanpercentile(rank_b, hi, axis=0),
+                "p_top": (rank_b <= TOPN).sum(axis=0) / n_reps,
+            }
+        for j, w in enumerate(words):
+            records.append({"target": t, "word": w, **{c: float(v[j]) for c, v in cols_stats.items()}})
+    return records
+
+
+def full_top(cdir: Path) -> Dict[str, List[str]]:
+    """
+    Each target's full-sample top TOPN neighbours in this year.
+    """
+    itos = load_vocab(cdir)
+    full = np.load(rep_path(cdir, -1))
+    out: Dict[str, List[str]] = {}
+    for k, t in enumerate(TARGETS):
+        s = np.where(np.isnan(full[k]), -np.inf, full[k])
+        if t in itos:
+            s[itos.index(t)] = -np.inf
+        top = np.argsort(-s, kind="stable")[:TOPN]
+        out[t] = [itos[i] for i in top if np.isfinite(s[i])]
+    return out
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    files = sorted(TOKEN_DIR.glob("20*.tokens.txt"))
+    if YEARS:
+        files = [f for f in files if f.name.split(".")[0] in YEARS]
+    if not files:
+        raise SystemExit(f"No token files found in {TOKEN_DIR.resolve()}")
+
+    params = current_params()
+    dirs = {f.name.split(".")[0]: prepare(f, params) for f in files}
+
+    jobs: List[Tuple[Path, List[int], Params]] = []
+    for year, cdir in dirs.items():
+        todo = [r for r in range(-1, REPLICATES) if not rep_path(cdir, r).exists()]
+        print(f"{year}: {REPLICATES - len([r for r in todo if r >= 0])} replicates cached, {len(todo)} to compute")
+        jobs += [(cdir, c, params) for c in chunks(todo, WORKERS)]
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+            done = 0
+            for n in pool.map(run_replicates, *zip(*jobs)):
+                done += n
+            print(f"computed {done} models ({METHOD}, unit={UNIT})")
+
+    probes: Dict[str, List[str]] = {t: [] for t in TARGETS}
+    for cdir in dirs.values():
+        for t, words in full_top(cdir).items():
+            probes[t] += [w for w in words if w not in probes[t]]
+
+    cols = ["sim", "rank", "sim_mean", "sim_lo", "sim_hi", "rank_median", "rank_lo", "rank_hi", "p_top"]
+    lines = ["year\ttarget\tword\t" + "\t".join(cols) + "\treplicates"]
+    for year, cdir in dirs.items():
+        records = year_stats(cdir, probes, REPLICATES)
+        for r in records:
+            lines.append(f"{year}\t{r['target']}\t{r['word']}\t" + "\t".join(f"{r[c]:.4f}" for c in cols)
+                         + f"\t{REPLICATES}")
+        for t in TARGETS:
+            top = sorted((r for r in records if r["target"] == t and r["rank"] <= TOPN), key=lambda r: r["rank"])
+            if not top:
+                continue
+            print(f"\n=== {year} {t} ({REPLICATES} replicates, {CI:.0%} CI) ===")
+            print(f"{'word':15s} {'sim':>6s} {'CI':>15s} {'rank':>5s} {'rank CI':>11s} {'p_top':>6s}")
+            for r in top:
+                print(f"{r['word']:15s} {r['sim']:6.3f} [{r['sim_lo']:.3f}, {r['sim_hi']:.3f}] {r['rank']:5.0f} "
+                      f"[{r['rank_lo']:4.0f}, {r['rank_hi']:4.0f}] {r['p_top']:6.2f}")
+
+    out = OUT_DIR / "report.tsv"
+    out.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print("\nwrote", out)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Bootstrap CIs for target similarities and neighbour ranks")
+    ap.add_argument("--targets", nargs="+", default=TARGETS)
+    ap.add_argument("--years", nargs="+", default=YEARS)
+    ap.add_argument("--replicates", type=int, default=REPLICATES)
+    ap.add_argument("--unit", choices=UNITS, default=UNIT)
+    ap.add_argument("--method", choices=METHODS, default=METHOD)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--topn", type=int, default=TOPN)
+    args = ap.parse_args()
+    TARGETS, YEARS, REPLICATES = args.targets, args.years, args.replicates
+    UNIT, METHOD, WORKERS, TOPN = args.unit, args.method, args.workers, args.topn
+    main()
@@ -0,0 +1,319 @@
+"""
+Per-year kNN graphs over the full vocabulary and concept clusters
+
+Input:
+  ./vectors/   (vectors.py; exported from models/ if stale)
+Output (./clusters/):
+  [name].[dtype].knn[K].npz     sparse CSR kNN graph (scipy.sparse), row i
+                                holds the K most cosine-similar rows to row i
+  [name].[dtype].knn[K].[method][N].labels.npy
+                                cluster id of each row (int32; rows as in
+                                vectors/[name].[dtype].ids.npy)
+  [name].[dtype].knn[K].[method][N].tsv
+                                cluster id, size, most central members
+  drift.tsv                     per target and consecutive year pair:
+                                kNN overlap, cluster overlap, and the
+                                adjusted Rand index over the shared vocabulary
+
+The graph is built by blocked matrix multiplication on the unit vectors:
+a block of rows is multiplied by the whole matrix and only each row's
+top K are kept, so peak memory is one block of scores (BLOCK_MB) rather
+than the vocab x vocab similarity matrix.
+
+Clustering (METHOD):
+  graph    spectral embedding of the symmetrised kNN graph (negative
+           similarities dropped), then mini-batch k-means on the embedding
+  kmeans   mini-batch k-means on the unit vectors directly
+
+File names carry every parameter the rows and labels depend on (dtype,
+K, method, N), so switching parameters never reuses another setting's
+files. Graphs and labels are rebuilt only when the vectors are newer, so a run
+over all years recomputes what changed and other scripts read the saved
+maps (ClusterMap, cluster_labels; plot_semantic_space.py colours points
+by cluster).
+
+Run:
+  python clusters.py
+  python clusters.py --k 20 --clusters 80 --method kmeans --targets 科学 技術
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+import vectors
+from vectors import VectorStore, YearVectors
+
+
+# -------------------------
+# Config
+# -------------------------
+CLUSTER_DIR = Path("clusters")
+MODEL_GLOB = vectors.MODEL_GLOB
+DTYPE = vectors.DTYPE
+EXPORT = True
+
+K = 15
+BLOCK_MB = 256                 # scores held at once while building the graph
+METHODS = ("graph", "kmeans")
+METHOD = "graph"
+N_CLUSTERS = 50
+EMBED_DIM = 50                 # spectral embedding dimensions (graph method)
+MEMBERS = 10                   # members listed per cluster in the .tsv
+TARGETS = ["科学", "イノベーション"]
+
+RANDOM_STATE = 42
+
+
+def graph_path(name: str, k: int = K, dtype: str = DTYPE, out_dir: Path = CLUSTER_DIR) -> Path:
+    return out_dir / f"{name}.{dtype}.knn{k}.npz"
+
+
+def labels_path(name: str, k: int = K, method: str = METHOD, n_clusters: int = N_CLUSTERS,
+                dtype: str = DTYPE, out_dir: Path = CLUSTER_DIR) -> Path:
+    return out_dir / f"{name}.{dtype}.knn{k}.{method}{n_clusters}.labels.npy"
+
+
+# -------------------------
+# kNN graph
+# -------------------------
+def knn_graph(yv: YearVectors, k: int = K, block_mb: int = BLOCK_MB):
+    """
+    Sparse (n x n) CSR matrix of each row's k nearest rows (self excluded),
+    with cosine similarities as data.
+    """
+    from scipy.sparse import csr_matrix
+
+    full = yv.dense()
+    n = len(full)
+    k = min(k, n - 1)
+    block = max(1, (block_mb << 20) // (4 * n))
+
+    indices = np.empty((n, k), dtype=np.int32)
+    data = np.empty((n, k), dtype=np.float32)
+    for s in range(0, n, block):
+        sims = full[s:s + block] @ full.T
+        rows = np.arange(len(sims))
+        sims[rows, rows + s] = -np.inf
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        vals = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-vals, axis=1)
+        indices[s:s + block] = np.take_along_axis(top, order, axis=1)
+        data[s:s + block] = np.take_along_axis(vals, order, axis=1)
+
+    indptr = np.arange(0, n * k + 1, k, dtype=np.int64)
+    return csr_matrix((data.ravel(), indices.ravel(), indptr), shape=(n, n))
+
+
+# -------------------------
+# Clustering
+# -------------------------
+def cluster(graph, yv: YearVectors, n_clusters: int = N_CLUSTERS, method: str = METHOD) -> np.ndarray:
+    from sklearn.cluster import MiniBatchKMeans
+
+    n_clusters = min(n_clusters, graph.shape[0])
+    if method == "graph":
+        from sklearn.manifold import spectral_embedding
+
+        affinity = graph.maximum(graph.T).tocsr()
+        affinity.data = np.maximum(affinity.data, 0)
+        affinity.eliminate_zeros()
+        dim = min(EMBED_DIM, graph.shape[0] - 1)
+        x = spectral_embedding(affinity, n_components=dim, random_state=RANDOM_STATE, drop_first=False)
+    elif method == "kmeans":
+        x = yv.dense()
+    else:
+        raise ValueError(f"unknown method: {method} (expected one of {', '.join(METHODS)})")
+
+    km = MiniBatchKMeans(n_clusters=n_clusters, random_state=RANDOM_STATE, n_init=3, batch_size=4096)
+    return km.fit_predict(x).astype(np.int32)
+
+
+def build_year(yv: YearVectors, vector_file: Path, k: int = K, n_clusters: int = N_CLUSTERS,
+               method: str = METHOD, out_dir: Path = CLUSTER_DIR, block_mb: int = BLOCK_MB,
+               dtype: str = DTYPE) -> bool:
+    """
+    (Re)build the graph of one year if it is missing or older than the
+    vectors, and the labels if they are missing or older than the graph.
+    Returns True if anything was rebuilt.
+    """
+    from scipy.sparse import load_npz, save_npz
+
+    def fresh(path: Path, ref: Path) -> bool:
+        return path.exists() and path.stat().st_mtime >= ref.stat().st_mtime
+
+    gp = graph_path(yv.name, k, dtype, out_dir)
+    lp = labels_path(yv.name, k, method, n_clusters, dtype, out_dir)
+    if fresh(gp, vector_file) and fresh(lp, gp):
+        return False
+
+    if fresh(gp, vector_file):
+        graph = load_npz(gp)
+    else:
+        graph = knn_graph(yv, k, block_mb)
+        save_npz(gp, graph)
+    labels = cluster(graph, yv, n_clusters, method)
+    np.save(lp, labels)
+    write_summary(ClusterMap(yv, graph, labels), lp.with_name(lp.name.replace(".labels.npy", ".tsv")))
+    return True
+
+
+# -------------------------
+# Reading the maps
+# -------------------------
+class ClusterMap:
+    """
+    One year's kNN graph and cluster labels, indexed like its YearVectors.
+    """
+
+    def __init__(self, yv: YearVectors, graph, labels: np.ndarray) -> None:
+        self.yv = yv
+        self.graph = graph
+        self.labels = labels
+
+    @classmethod
+    def load(cls, yv: YearVectors, k: int = K, n_clusters: int = N_CLUSTERS,
+             method: str = METHOD, out_dir: Path = CLUSTER_DIR, dtype: str = DTYPE) -> "ClusterMap":
+        from scipy.sparse import load_npz
+
+        return cls(yv, load_npz(graph_path(yv.name, k, dtype, out_dir)),
+                   np.load(labels_path(yv.name, k, method, n_clusters, dtype, out_dir)))
+
+    def label(self, word: str) -> int:
+        r = self.yv.row(word)
+        return -1 if r < 0 else int(self.labels[r])
+
+    def neighbor_ids(self, word: str) -> np.ndarray:
+        """
+        Shared vocabulary ids of the word's kNN row (empty if out of vocabulary).
+        """
+        r = self.yv.row(word)
+        if r < 0:
+            return np.zeros(0, dtype=np.uint32)
+        return self.yv.ids[self.graph.indices[self.graph.indptr[r]:self.graph.indptr[r + 1]]]
+
+    def member_ids(self, c: int) -> np.ndarray:
+        return self.yv.ids[self.labels == c]
+
+    def central(self, c: int, n: int = MEMBERS) -> List[str]:
+        """
+        Members of cluster c with the most in-links from the same cluster.
+        """
+        rows = np.flatnonzero(self.labels == c)
+        indeg = np.bincount(self.graph[rows][:, rows].indices, minlength=len(rows))
+        top = rows[np.argsort(-indeg, kind="stable")[:n]]
+        return [self.yv.vocab[i] for i in self.yv.ids[top]]
+
+
+def cluster_labels(name: str, words: Sequence[str], method: str = METHOD, n_clusters: int = N_CLUSTERS,
+                   out_dir: Path = CLUSTER_DIR, vector_dir: Path = vectors.VECTOR_DIR,
+                   dtype: str = DTYPE, k: int = K) -> Optional[np.ndarray]:
+    """
+    Cluster id of each word in year `name` (-1 if out of vocabulary), or None
+    if no cluster map has been built for that year.
+    """
+    lp = labels_path(name, k, method, n_clusters, dtype, out_dir)
+    if not lp.exists():
+        return None
+    labels = np.load(lp)
+    ids = np.load(vectors.ids_path(vector_dir, name, dtype))
+    vocab = vectors.load_vocab(vector_dir)
+    row = {vocab[i]: r for r, i in enumerate(ids)}
+    return np.array([labels[row[w]] if w in row else -1 for w in words], dtype=np.int32)
+
+
+def write_summary(cm: ClusterMap, out: Path) -> None:
+    sizes = np.bincount(cm.labels)
+    lines = ["cluster\tsize\tmembers"]
+    for c in np.argsort(-sizes, kind="stable"):
+        if sizes[c]:
+            lines.append(f"{c}\t{sizes[c]}\t{' '.join(cm.central(int(c)))}")
+    out.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+# -------------------------
+# Drift
+# -------------------------
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    union = len(np.union1d(a, b))
+    return len(np.intersect1d(a, b)) / union if union else float("nan")
+
+
+def shared_ari(a: ClusterMap, b: ClusterMap) -> float:
+    """
+    Adjusted Rand index of the two years' labels over their shared words.
+    """
+    from sklearn.metrics import adjusted_rand_score
+
+    shared = np.intersect1d(a.yv.ids, b.yv.ids)
+    return float(adjusted_rand_score(a.labels[a.yv.rows[shared]], b.labels[b.yv.rows[shared]]))
+
+
+def drift(maps: Dict[str, ClusterMap], targets: Sequence[str]) -> List[str]:
+    """
+    TSV rows: target, year pair, kNN Jaccard, cluster-member Jaccard, ARI.
+    """
+    names = list(maps)
+    lines = ["target\tfrom\tto\tknn_jaccard\tcluster_jaccard\tari"]
+    for prev, cur in zip(names, names[1:]):
+        a, b = maps[prev], maps[cur]
+        ari = shared_ari(a, b)
+        for t in targets:
+            if t not in a.yv or t not in b.yv:
+                continue
+            knn = jaccard(a.neighbor_ids(t), b.neighbor_ids(t))
+            members = jaccard(a.member_ids(a.label(t)), b.member_ids(b.label(t)))
+            lines.append(f"{t}\t{prev}\t{cur}\t{knn:.3f}\t{members:.3f}\t{ari:.3f}")
+    return lines
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    if EXPORT:
+        for name in vectors.export(vectors.MODEL_DIR, vectors.VECTOR_DIR, MODEL_GLOB, DTYPE):
+            print("wrote", vectors.VECTOR_DIR / f"{name}.{DTYPE}.npy")
+
+    store = VectorStore(vectors.VECTOR_DIR, MODEL_GLOB, DTYPE)
+    CLUSTER_DIR.mkdir(parents=True, exist_ok=True)
+
+    maps: Dict[str, ClusterMap] = {}
+    for name in store.names:
+        yv = store[name]
+        if build_year(yv, vectors.VECTOR_DIR / f"{name}.{DTYPE}.npy", K, N_CLUSTERS, METHOD, CLUSTER_DIR,
+                      BLOCK_MB, DTYPE):
+            print(f"built {name}: {len(yv.ids)} words, k={K}, {METHOD} {N_CLUSTERS} clusters")
+        maps[name] = ClusterMap.load(yv, K, N_CLUSTERS, METHOD, CLUSTER_DIR, DTYPE)
+
+    for t in TARGETS:
+        print(f"\n=== {t} ===")
+        for name, cm in maps.items():
+            c = cm.label(t)
+            if c < 0:
+                print(f"{name}: not in vocabulary")
+                continue
+            print(f"{name}: cluster {c} ({int((cm.labels == c).sum())} words) {' '.join(cm.central(c))}")
+
+    out = CLUSTER_DIR / "drift.tsv"
+    out.write_text("\n".join(drift(maps, TARGETS)) + "\n", encoding="utf-8")
+    print("\nwrote", out)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Per-year kNN graphs and concept clusters over vectors/")
+    ap.add_argument("--k", type=int, default=K)
+    ap.add_argument("--clusters", type=int, default=N_CLUSTERS)
+    ap.add_argument("--method", choices=METHODS, default=METHOD)
+    ap.add_argument("--glob", default=MODEL_GLOB)
+    ap.add_argument("--dtype", choices=vectors.DTYPES, default=DTYPE)
+    ap.add_argument("--targets", nargs="+", default=TARGETS)
+    ap.add_argument("--no-export", action="store_true", help="use vectors/ as is")
+    args = ap.parse_args()
+    K, N_CLUSTERS, METHOD, MODEL_GLOB, DTYPE = args.k, args.clusters, args.method, args.glob, args.dtype
+    TARGETS, EXPORT = args.targets, not args.no_export
+    main()
@@ -209,6 +209,8 @@ with MANIFEST.open("a", encoding="utf-8", newline="") as f:
 print(f"Done. OK={ok}, NG={ng}")
 """
 
+import argparse
+import re
 import time
 from pathlib import Path
 from urllib.parse import urljoin
@@ -217,53 +219,195 @@ import requests
 from bs4 import BeautifulSoup
 
 INDEX_URL = "https://warp.ndl.go.jp/web/20190601103017/http://www.mext.go.jp/b_menu/hakusho/html/hpaa195801/index.html"
+LINK_PAT = "hpaa195801_2_"
 
 OUT_DIR = Path("data/hpaa195801")
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-
-session = requests.Session()
-session.headers.update({
-    "User-Agent": "Mozilla/5.0",
-    "Referer": INDEX_URL,
-})
-
-# -----------------------
-# STEP 1: index取得
-# -----------------------
-
-res = session.get(INDEX_URL)
-res.encoding = res.apparent_encoding
-
-soup = BeautifulSoup(res.text, "lxml")
-
-# -----------------------
-# STEP 2: リンク抽出
-# -----------------------
-
-page_links = []
 
-for a in soup.find_all("a", href=True):
-    href = a["href"]
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
+SLEEP = 1.0
+TIMEOUT = 30
 
-    if "hpaa195801_2_" in href and href.endswith(".html"):
-        page_links.append(urljoin(INDEX_URL, href))
+# 同意画面のボタン文言（.archive/consent.py と同じ）
+CONSENT_TEXTS = ["必要最小限"]
+# 文言を探す要素：ボタン類と、id/class に cookie/consent を含むバナー内のリンク
+# （本文中の「必要最小限」を同意画面と誤認しないよう、ページ全体の文字列では判定しない）
+CONSENT_SELECTOR = ", ".join([
+    "button", "[role=button]", "input[type=button]", "input[type=submit]",
+    "[id*=cookie i] a", "[class*=cookie i] a", "[id*=consent i] a", "[class*=consent i] a",
+])
+# requests の応答がこれらのステータスなら、ブラウザで取り直す
+BROWSER_STATUS = {202, 403}
+HEADLESS = True
 
-print("found:", len(page_links))
 
-# -----------------------
-# STEP 3: 各ページ取得
-# -----------------------
-
-for i, url in enumerate(page_links):
-
-    print("getting:", url)
+def html_to_text(html: str) -> str:
+    soup = BeautifulSoup(html, "lxml")
 
-    r = session.get(url)
-    r.encoding = r.apparent_encoding
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
 
-    text = BeautifulSoup(r.text, "lxml").get_text("\n", strip=True)
+    text = soup.get_text("\n", strip=True)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip() + "\n"
 
-    out = OUT_DIR / f"{i:03d}.txt"
-    out.write_text(text, encoding="utf-8")
 
-    time.sleep(1)
\ No newline at end of file
+def is_consent_page(html: str) -> bool:
+    """
+    同意ボタン（CONSENT_SELECTOR の要素で、文言が CONSENT_TEXTS を含むもの）があるか
+    """
+    if not any(t in html for t in CONSENT_TEXTS):
+        return False
+    soup = BeautifulSoup(html, "lxml")
+    for el in soup.select(CONSENT_SELECTOR):
+        label = el.get_text(" ", strip=True) or el.get("value", "")
+        if any(t in label for t in CONSENT_TEXTS):
+            return True
+    return False
+
+
+class WarpSession:
+    """
+    通常は requests.Session で取得し、同意画面・ブロック応答のときだけ Playwright を使う。
+    ブラウザは最初に必要になった時点で1回だけ起動して使い回し、同意後の Cookie は
+    requests 側へ移すので、以降のページは再び requests で取得できる。
+
+        with WarpSession() as s:
+            html = s.get(url)
+    """
+
+    def __init__(self, headless: bool = HEADLESS) -> None:
+        self.headless = headless
+        self.http = requests.Session()
+        self.http.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "ja,en;q=0.8",
+        })
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._page = None
+        self.stats = {"http": 0, "browser": 0, "launches": 0, "consents": 0}
+
+    def __enter__(self) -> "WarpSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -----------------------
+    # ブラウザ（必要になったときだけ起動）
+    # -----------------------
+    def _ensure_browser(self) -> None:
+        if self._context is not None:
+            return
+        from playwright.sync_api import sync_playwright
+
+        self._pw = sync_playwright().start()
+        self._browser = self._pw.chromium.launch(headless=self.headless)
+        self._context = self._browser.new_context(user_agent=USER_AGENT, locale="ja-JP")
+        self._page = self._context.new_page()
+        self.stats["launches"] += 1
+
+    def _click_consent(self) -> bool:
+        for txt in CONSENT_TEXTS:
+            loc = self._page.get_by_role("button", name=txt, exact=False)
+            if loc.count() == 0:
+                loc = self._page.locator(CONSENT_SELECTOR).filter(has_text=txt)
+            if loc.count() > 0:
+                loc.first.click()
+                self._page.wait_for_load_state("domcontentloaded")
+                self.stats["consents"] += 1
+                return True
+        return False
+
+    def export_cookies(self) -> None:
+        """
+        ブラウザコンテキストの Cookie を requests.Session へ写す
+        """
+        for c in self._context.cookies():
+            self.http.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+
+    def browser_get(self, url: str) -> str:
+        self._ensure_browser()
+        self._page.goto(url, wait_until="domcontentloaded")
+        if self._click_consent():
+            self._page.goto(url, wait_until="domcontentloaded")
+        self.export_cookies()
+        self.stats["browser"] += 1
+        return self._page.content()
+
+    # -----------------------
+    # 取得
+    # -----------------------
+    def get(self, url: str, referer: str = "") -> str:
+        headers = {"Referer": referer} if referer else {}
+        r = self.http.get(url, timeout=TIMEOUT, headers=headers)
+        r.encoding = r.apparent_encoding
+        if r.status_code in BROWSER_STATUS or is_consent_page(r.text):
+            return self.browser_get(url)
+        r.raise_for_status()
+        self.stats["http"] += 1
+        return r.text
+
+    def close(self) -> None:
+        if self._browser is not None:
+            self._browser.close()
+        if self._pw is not None:
+            self._pw.stop()
+        self._pw = self._browser = self._context = self._page = None
+        self.http.close()
+
+
+def page_links(index_html: str, index_url: str = INDEX_URL, pattern: str = LINK_PAT):
+    soup = BeautifulSoup(index_html, "lxml")
+    links = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        if pattern in href and href.endswith(".html"):
+            url = urljoin(index_url, href)
+            if url not in links:
+                links.append(url)
+    return links
+
+
+def main() -> None:
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    with WarpSession(HEADLESS) as s:
+        # -----------------------
+        # STEP 1: index取得（必要ならここで同意する）
+        # -----------------------
+        links = page_links(s.get(INDEX_URL), INDEX_URL, LINK_PAT)
+        print("found:", len(links))
+
+        # -----------------------
+        # STEP 2: 各ページ取得
+        # -----------------------
+        for i, url in enumerate(links):
+            print("getting:", url)
+            text = html_to_text(s.get(url, referer=INDEX_URL))
+
+            out = OUT_DIR / f"{i:03d}.txt"
+            out.write_text(text, encoding="utf-8")
+
+            time.sleep(SLEEP)
+
+        stats = dict(s.stats)
+
+    print(f"done in {time.perf_counter() - t0:.1f}s: http={stats['http']} browser={stats['browser']} "
+          f"launches={stats['launches']} consents={stats['consents']}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Collect WARP whitepaper pages")
+    ap.add_argument("--index-url", default=INDEX_URL)
+    ap.add_argument("--link-pattern", default=LINK_PAT)
+    ap.add_argument("--out", type=Path, default=OUT_DIR)
+    ap.add_argument("--sleep", type=float, default=SLEEP)
+    ap.add_argument("--headed", action="store_true", help="show the browser window")
+    args = ap.parse_args()
+    INDEX_URL, LINK_PAT, OUT_DIR, SLEEP = args.index_url, args.link_pattern, args.out, args.sleep
+    HEADLESS = not args.headed
+    main()
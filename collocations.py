@@ -0,0 +1,179 @@
+"""
+Windowed collocation statistics for target words, per year
+
+Input:
+  ./stats/vocab.txt, ./stats/[year].ids.npy   (output of corpus_stats.py)
+Output (./stats/):
+  collocations.tsv   year, target, collocate, co-occurrence count,
+                     expected count, PMI, log-likelihood, t-score
+
+For every year the target positions are found once (np.isin over the id
+stream) and, for each offset -WINDOW..WINDOW, the ids at those positions
+plus the offset are paired with the target, so the work is a few array
+operations per offset instead of a loop over tokens. Pairs are counted
+with np.unique on (target, collocate) keys, for all targets at once.
+
+Association scores treat the 2*WINDOW slots around each target
+occurrence as the sample:
+  E   = f(target) * 2*WINDOW * f(collocate) / N
+  PMI = log2(O / E)
+  LL  = Dunning's G2 over the 2x2 table (slots near target vs. elsewhere)
+  t   = (O - E) / sqrt(O)
+
+Run:
+  python collocations.py                      # TARGETS
+  python collocations.py 科学 技術 --window 3 --measure pmi --top 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from corpus_stats import OUT_DIR, Vocab, load_ids, load_stats
+
+
+# -------------------------
+# Config
+# -------------------------
+TARGETS = ["科学", "イノベーション"]
+WINDOW = 5
+MIN_PAIR_COUNT = 3
+MEASURES = ("ll", "pmi", "t")
+MEASURE = "ll"
+TOP = 15
+
+# Collocates made only of symbols, digits or whitespace are skipped
+SKIP_PAT = re.compile(r"^[\W\d_]+$")
+
+
+# -------------------------
+# Counting
+# -------------------------
+def cooccurrence(ids: np.ndarray, target_ids: np.ndarray, window: int = WINDOW) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Windowed co-occurrence counts of every target with every collocate.
+    Returns parallel arrays (target index into target_ids, collocate id, count).
+    """
+    pos = np.flatnonzero(np.isin(ids, target_ids))
+    # index of each occurrence's target within target_ids
+    order = np.argsort(target_ids)
+    which = order[np.searchsorted(target_ids[order], ids[pos])]
+
+    n = len(ids)
+    keys: List[np.ndarray] = []
+    for d in range(-window, window + 1):
+        if d == 0:
+            continue
+        ok = (pos + d >= 0) & (pos + d < n)
+        keys.append(which[ok].astype(np.int64) << 32 | ids[pos[ok] + d].astype(np.int64))
+    if not keys:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.int64)
+
+    uniq, counts = np.unique(np.concatenate(keys), return_counts=True)
+    return uniq >> 32, uniq & 0xFFFFFFFF, counts
+
+
+def association(o11: np.ndarray, f_target: np.ndarray, f_coll: np.ndarray, n: int, span: int) -> Dict[str, np.ndarray]:
+    """
+    Expected count, PMI, log-likelihood (G2) and t-score for each pair.
+    """
+    o11 = o11.astype(np.float64)
+    r1 = f_target.astype(np.float64) * span        # window slots around the target
+    c1 = f_coll.astype(np.float64)
+    n = float(n)
+
+    e11 = r1 * c1 / n
+    obs = [o11, r1 - o11, c1 - o11, n - r1 - c1 + o11]
+    exp = [e11, r1 * (n - c1) / n, (n - r1) * c1 / n, (n - r1) * (n - c1) / n]
+    ll = np.zeros_like(o11)
+    for o, e in zip(obs, exp):
+        o = np.maximum(o, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ll += np.where(o > 0, o * np.log(o / e), 0.0)
+    ll *= 2
+    # negative association gets a negative sign, so ranking by LL keeps attraction first
+    ll = np.where(o11 < e11, -ll, ll)
+
+    return {
+        "expected": e11,
+        "pmi": np.log2(o11 / e11),
+        "ll": ll,
+        "t": (o11 - e11) / np.sqrt(o11),
+    }
+
+
+def skip_mask(vocab: Vocab) -> np.ndarray:
+    return np.fromiter((bool(SKIP_PAT.match(t)) for t in vocab.itos), dtype=bool, count=len(vocab))
+
+
+def year_table(ids: np.ndarray, vocab: Vocab, targets: List[str], window: int = WINDOW,
+               min_count: int = MIN_PAIR_COUNT, skip: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    All (target, collocate) pairs of one year with count >= min_count.
+    Arrays are parallel; "target" indexes "names" (the targets found in vocab).
+    """
+    known = [t for t in targets if t in vocab.stoi]
+    target_ids = np.array([vocab.stoi[t] for t in known], dtype=np.uint32)
+    freq = np.bincount(ids, minlength=len(vocab))
+
+    t_idx, coll, o11 = cooccurrence(ids, target_ids, window)
+    keep = o11 >= min_count
+    if skip is not None:
+        keep &= ~skip[coll]
+    t_idx, coll, o11 = t_idx[keep], coll[keep], o11[keep]
+
+    scores = association(o11, freq[target_ids[t_idx]], freq[coll], len(ids), 2 * window)
+    return {"target": t_idx, "collocate": coll, "count": o11, **scores, "names": np.array(known)}
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    if not (OUT_DIR / "freq.npz").exists():
+        raise SystemExit(f"No corpus statistics in {OUT_DIR.resolve()} (run corpus_stats.py first)")
+    vocab, years, _ = load_stats(OUT_DIR)
+
+    missing = [t for t in TARGETS if t not in vocab.stoi]
+    if missing:
+        print("not in vocabulary:", ", ".join(missing))
+
+    skip = skip_mask(vocab)
+    lines = ["year\ttarget\tcollocate\tcount\texpected\tpmi\tll\tt"]
+    for y in years:
+        tab = year_table(load_ids(y, OUT_DIR), vocab, TARGETS, WINDOW, MIN_PAIR_COUNT, skip)
+        for ti, name in enumerate(tab["names"]):
+            rows = np.flatnonzero(tab["target"] == ti)
+            rows = rows[np.argsort(-tab[MEASURE][rows], kind="stable")]
+
+            print(f"\n=== {y} {name} (by {MEASURE}) ===")
+            print(f"{'collocate':15s} {'count':>6s} {'pmi':>6s} {'ll':>8s} {'t':>6s}")
+            for r in rows[:TOP]:
+                print(f"{vocab.itos[tab['collocate'][r]]:15s} {int(tab['count'][r]):6d} "
+                      f"{tab['pmi'][r]:6.2f} {tab['ll'][r]:8.1f} {tab['t'][r]:6.2f}")
+            for r in rows:
+                lines.append(
+                    f"{y}\t{name}\t{vocab.itos[tab['collocate'][r]]}\t{int(tab['count'][r])}\t"
+                    f"{tab['expected'][r]:.3f}\t{tab['pmi'][r]:.3f}\t{tab['ll'][r]:.3f}\t{tab['t'][r]:.3f}"
+                )
+
+    out = OUT_DIR / "collocations.tsv"
+    out.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print("\nwrote", out)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Per-year collocations of target words")
+    ap.add_argument("targets", nargs="*", default=TARGETS)
+    ap.add_argument("--window", type=int, default=WINDOW)
+    ap.add_argument("--min-count", type=int, default=MIN_PAIR_COUNT)
+    ap.add_argument("--measure", choices=MEASURES, default=MEASURE)
+    ap.add_argument("--top", type=int, default=TOP)
+    args = ap.parse_args()
+    TARGETS, WINDOW, MIN_PAIR_COUNT = args.targets, args.window, args.min_count
+    MEASURE, TOP = args.measure, args.top
+    main()
@@ -0,0 +1,222 @@
+"""
+Compound-term protection for Sudachi token streams.
+
+Sudachi (even in mode C) sometimes splits policy compounds such as
+科学技術 or 研究開発 into several morphemes. This module keeps a term list
+in a character trie and merges runs of consecutive morphemes whose
+concatenation is a listed term, in one left-to-right pass over the
+morphemes (leftmost-longest match). The cost per morpheme is bounded by
+the length of the longest term, not by the number of terms, so a list of
+thousands of terms costs about the same as a list of ten.
+
+Term list:
+  ./compounds.txt   one term per line, '#' starts a comment
+
+Run (mine candidate compounds from the corpus and write compounds.txt):
+  python compounds.py
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+# -------------------------
+# Config
+# -------------------------
+COMPOUND_FILE = Path("compounds.txt")
+IN_DIR = Path("txt_clean")
+
+# Mining: runs of consecutive nouns of this many morphemes are candidates
+MINE_MIN_LEN = 2
+MINE_MAX_LEN = 4
+MINE_MIN_COUNT = 5
+
+# Second-level POS that must not take part in a mined compound
+MINE_SKIP_POS = {"数詞"}
+
+
+# -------------------------
+# Trie
+# -------------------------
+class CompoundTrie:
+    """
+    Character trie over compound terms.
+
+    Nodes are integer ids; node 0 is the root. Matching walks the trie
+    character by character across consecutive morpheme surfaces, and a
+    match is only accepted where the walk ends exactly on a morpheme
+    boundary, so merges never cut a morpheme in half.
+    """
+
+    def __init__(self, terms: Iterable[str] = ()) -> None:
+        self._children: List[Dict[str, int]] = [{}]
+        self._terminal: List[bool] = [False]
+        self.size = 0
+        self.max_len = 0
+        for term in terms:
+            self.add(term)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, term: str) -> None:
+        term = term.strip()
+        if not term:
+            return
+        node = 0
+        for ch in term:
+            nxt = self._children[node].get(ch)
+            if nxt is None:
+                nxt = len(self._children)
+                self._children[node][ch] = nxt
+                self._children.append({})
+                self._terminal.append(False)
+            node = nxt
+        if not self._terminal[node]:
+            self._terminal[node] = True
+            self.size += 1
+            self.max_len = max(self.max_len, len(term))
+
+    def longest_match(self, tokens: Sequence[str], start: int) -> int:
+        """
+        Return the number of morphemes of the longest term starting at
+        tokens[start], or 0 if no term spanning 2+ morphemes starts there.
+        """
+        children = self._children
+        terminal = self._terminal
+        node = 0
+        best = 0
+        n_chars = 0
+        i = start
+        n = len(tokens)
+        while i < n:
+            s = tokens[i]
+            n_chars += len(s)
+            if n_chars > self.max_len:
+                break
+            for ch in s:
+                node = children[node].get(ch, -1)
+                if node < 0:
+                    return best
+            i += 1
+            if terminal[node] and i - start >= 2:
+                best = i - start
+        return best
+
+    def merge(self, tokens: Sequence[str]) -> List[str]:
+        """
+        Merge listed compounds in a single left-to-right pass.
+        """
+        if not self.size:
+            return list(tokens)
+
+        out: List[str] = []
+        i = 0
+        n = len(tokens)
+        while i < n:
+            k = self.longest_match(tokens, i)
+            if k:
+                out.append("".join(tokens[i:i + k]))
+                i += k
+            else:
+                out.append(tokens[i])
+                i += 1
+        return out
+
+
+def load_terms(path: Path = COMPOUND_FILE) -> List[str]:
+    """
+    Read a term list (one term per line, '#' comments, blank lines ignored).
+    """
+    terms: List[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            terms.append(line)
+    return terms
+
+
+def load_trie(path: Path = COMPOUND_FILE) -> Optional[CompoundTrie]:
+    """
+    Build a trie from the term list, or return None if there is no list.
+    """
+    if not path.exists():
+        return None
+    return CompoundTrie(load_terms(path))
+
+
+# -------------------------
+# Mining
+# -------------------------
+def is_compound_part(pos: Sequence[str]) -> bool:
+    return bool(pos) and pos[0] == "名詞" and pos[1] not in MINE_SKIP_POS
+
+
+def mine_compounds(
+    texts: Iterable[str],
+    tokenizer,
+    mode,
+    min_len: int = MINE_MIN_LEN,
+    max_len: int = MINE_MAX_LEN,
+    min_count: int = MINE_MIN_COUNT,
+) -> List[str]:
+    """
+    Collect maximal runs of consecutive nouns and return those of
+    min_len..max_len morphemes seen at least min_count times,
+    most frequent first.
+    """
+    from tokenise import iter_chunks_by_paragraph
+
+    counts: Counter = Counter()
+    for text in texts:
+        for chunk in iter_chunks_by_paragraph(text):
+            run: List[str] = []
+            for m in tokenizer.tokenize(chunk, mode):
+                if is_compound_part(m.part_of_speech()):
+                    run.append(m.surface())
+                    continue
+                if min_len <= len(run) <= max_len:
+                    counts["".join(run)] += 1
+                run = []
+            if min_len <= len(run) <= max_len:
+                counts["".join(run)] += 1
+
+    return [t for t, c in counts.most_common() if c >= min_count]
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    from sudachipy import dictionary
+    from tokenise import get_split_mode
+
+    tokenizer = dictionary.Dictionary().create()
+    mode = get_split_mode(tokenizer)
+
+    files = sorted(IN_DIR.glob("*.txt"))
+    if not files:
+        raise SystemExit(f"No .txt files found in {IN_DIR.resolve()}")
+
+    texts = (p.read_text(encoding="utf-8", errors="ignore") for p in files)
+    terms = mine_compounds(texts, tokenizer, mode)
+
+    existing: List[str] = load_terms(COMPOUND_FILE) if COMPOUND_FILE.exists() else []
+    seen = set(existing)
+    added = [t for t in terms if t not in seen and not re.search(r"\s", t)]
+
+    with COMPOUND_FILE.open("a", encoding="utf-8") as f:
+        if not existing:
+            f.write("# compound terms merged by tokenise.py (one per line)\n")
+        for t in added:
+            f.write(t + "\n")
+
+    print(f"mined {len(terms)} candidates, added {len(added)} to {COMPOUND_FILE}")
+
+
+if __name__ == "__main__":
+    main()
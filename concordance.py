@@ -0,0 +1,232 @@
+"""
+Positional inverted index over tokens/ and KWIC concordance queries
+
+Input:
+  ./tokens/[year].tokens.txt
+Output (./index/):
+  vocab.txt             shared vocabulary (line no. = term id)
+  [year].ids.npy        token id stream (uint32), used to print windows
+  [year].offsets.npy    byte offset of each term's postings (int64, len = vocab + 1)
+  [year].post.npy       positional postings: per term, gaps between
+                        positions as LEB128 varints (uint8)
+
+Queries load the arrays memory-mapped and decode only the postings of the
+query terms, so a lookup touches a few KB instead of the multi-MB token
+files. A query of several space-separated tokens is a phrase query.
+
+Run:
+  python concordance.py --build
+  python concordance.py 科学
+  python concordance.py 科学 技術 --window 8 --years 2019 2020 --limit 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from corpus_stats import TOKEN_DIR, Vocab, encode_corpus
+from provenance import Provenance
+
+
+# -------------------------
+# Config
+# -------------------------
+INDEX_DIR = Path("index")
+
+WINDOW = 6
+LIMIT = 30
+
+
+# -------------------------
+# Varint coding
+# -------------------------
+def varint_len(values: np.ndarray) -> np.ndarray:
+    """
+    Encoded size in bytes of each value (1..5 for values < 2**35).
+    """
+    n_bytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 5):
+        n_bytes += values >= (1 << (7 * k))
+    return n_bytes
+
+
+def varint_encode(values: np.ndarray) -> np.ndarray:
+    """
+    LEB128-encode non-negative integers (< 2**35) into a uint8 array.
+    """
+    values = values.astype(np.uint64)
+    n_bytes = varint_len(values)
+
+    ends = np.cumsum(n_bytes)
+    starts = ends - n_bytes
+    out = np.empty(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+
+    # byte j of each value, for the values that have at least j+1 bytes
+    for j in range(int(n_bytes.max()) if len(n_bytes) else 0):
+        has = n_bytes > j
+        chunk = (values[has] >> np.uint64(7 * j)) & np.uint64(0x7F)
+        more = (n_bytes[has] > j + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + j] = (chunk | more).astype(np.uint8)
+    return out
+
+
+def varint_decode(buf: np.ndarray) -> np.ndarray:
+    """
+    Decode a uint8 array of LEB128 varints.
+    """
+    if not len(buf):
+        return np.zeros(0, dtype=np.int64)
+    buf = np.asarray(buf)
+    last = (buf & 0x80) == 0
+    group = np.concatenate(([0], np.cumsum(last[:-1])))
+    starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    shift = 7 * (np.arange(len(buf)) - starts[group])
+    parts = (buf & 0x7F).astype(np.int64) << shift
+    return np.add.reduceat(parts, starts)
+
+
+# -------------------------
+# Build
+# -------------------------
+def build_postings(ids: np.ndarray, vocab_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group token positions by term and varint-encode the position gaps.
+    Returns (offsets, postings).
+    """
+    order = np.argsort(ids, kind="stable")  # positions, grouped by term, ascending
+    counts = np.bincount(ids, minlength=vocab_size)
+    term_start = np.concatenate(([0], np.cumsum(counts)))
+
+    # gap to the previous position of the same term; first position is absolute
+    gaps = order.astype(np.int64)
+    gaps[1:] -= order[:-1]
+    firsts = term_start[:-1][counts > 0]
+    gaps[firsts] = order[firsts]
+
+    byte_cum = np.concatenate(([0], np.cumsum(varint_len(gaps))))
+    return byte_cum[term_start], varint_encode(gaps)
+
+
+def build_index(token_dir: Path = TOKEN_DIR, index_dir: Path = INDEX_DIR) -> None:
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    vocab, ids = encode_corpus(token_dir)
+    vocab.save(index_dir / "vocab.txt")
+
+    for year, arr in sorted(ids.items()):
+        offsets, postings = build_postings(arr, len(vocab))
+        np.save(index_dir / f"{year}.ids.npy", arr)
+        np.save(index_dir / f"{year}.offsets.npy", offsets)
+        np.save(index_dir / f"{year}.post.npy", postings)
+        print(f"indexed {year} tokens={len(arr)} postings={postings.nbytes / 1024:.0f}KB")
+
+
+# -------------------------
+# Query
+# -------------------------
+class Concordance:
+    """
+    Read-only view of the index; arrays are memory-mapped per year.
+    """
+
+    def __init__(self, index_dir: Path = INDEX_DIR) -> None:
+        if not (index_dir / "vocab.txt").exists():
+            raise SystemExit(f"No index in {index_dir.resolve()} (run with --build)")
+        self.vocab = Vocab.load(index_dir / "vocab.txt")
+        self.years = sorted(p.name.split(".")[0] for p in index_dir.glob("*.post.npy"))
+        self._dir = index_dir
+        self._cache: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _arrays(self, year: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if year not in self._cache:
+            load = lambda kind: np.load(self._dir / f"{year}.{kind}.npy", mmap_mode="r")
+            self._cache[year] = (load("ids"), load("offsets"), load("post"))
+        return self._cache[year]
+
+    def positions(self, year: str, term: str) -> np.ndarray:
+        tid = self.vocab.stoi.get(term)
+        if tid is None:
+            return np.zeros(0, dtype=np.int64)
+        _, offsets, post = self._arrays(year)
+        if tid + 1 >= len(offsets):
+            return np.zeros(0, dtype=np.int64)
+        return np.cumsum(varint_decode(post[offsets[tid]:offsets[tid + 1]]))
+
+    def phrase_positions(self, year: str, terms: List[str]) -> np.ndarray:
+        hits = self.positions(year, terms[0])
+        for k, term in enumerate(terms[1:], start=1):
+            if not len(hits):
+                break
+            hits = np.intersect1d(hits, self.positions(year, term) - k, assume_unique=True)
+        return hits
+
+    def kwic(
+        self,
+        terms: List[str],
+        window: int = WINDOW,
+        years: Optional[List[str]] = None,
+        limit: Optional[int] = LIMIT,
+    ) -> Iterator[Tuple[str, int, List[str], List[str], List[str]]]:
+        """
+        Yield (year, position, left, match, right) token windows.
+        """
+        itos = self.vocab.itos
+        for year in years or self.years:
+            ids = self._arrays(year)[0]
+            hits = self.phrase_positions(year, terms)
+            if limit is not None:
+                hits = hits[:limit]
+            n = len(terms)
+            for p in hits.tolist():
+                lo = max(0, p - window)
+                hi = min(len(ids), p + n + window)
+                seg = [itos[i] for i in ids[lo:hi]]
+                yield year, p, seg[:p - lo], seg[p - lo:p - lo + n], seg[p - lo + n:]
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    ap = argparse.ArgumentParser(description="KWIC concordance over tokens/")
+    ap.add_argument("terms", nargs="*", help="token or phrase (space-separated tokens)")
+    ap.add_argument("--build", action="store_true", help="(re)build the index from tokens/")
+    ap.add_argument("--window", type=int, default=WINDOW)
+    ap.add_argument("--years", nargs="+")
+    ap.add_argument("--limit", type=int, default=LIMIT, help="max lines per year")
+    args = ap.parse_args()
+
+    if args.build:
+        t0 = time.perf_counter()
+        build_index()
+        print(f"built {INDEX_DIR} in {time.perf_counter() - t0:.2f}s")
+    if not args.terms:
+        return
+
+    conc = Concordance()
+    t0 = time.perf_counter()
+    rows = list(conc.kwic(args.terms, args.window, args.years, args.limit))
+    elapsed = time.perf_counter() - t0
+
+    year = None
+    prov: Optional[Provenance] = None
+    for y, p, left, match, right in rows:
+        if y != year:
+            print(f"\n===== {y} =====")
+            year = y
+            prov = Provenance.for_tokens(TOKEN_DIR / f"{y}.tokens.txt")
+        where = ""
+        if prov is not None:
+            src, page = prov.locate(p)
+            where = f"  ({src} p.{page})"
+        print(f"{' '.join(left):>40s} [{' '.join(match)}] {' '.join(right)}{where}")
+    print(f"\n{len(rows)} lines in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Corpus statistics over tokenised year files (replaces words_count.py)
+
+Input:
+  ./tokens/[year].tokens.txt   (space-separated tokens from tokenise.py)
+Output (./stats/):
+  vocab.txt          shared vocabulary, one token per line (line no. = id)
+  freq.npz           years x vocab frequency matrix (years, counts)
+  [year].ids.npy     integer-encoded token stream per year (uint32)
+  summary.tsv        tokens / types / hapax / TTR / Zipf fit per year
+  top.tsv            top-N frequency table per year
+  emerging.tsv       terms that appear / disappear between consecutive years
+
+Tokens are integer-encoded in one streaming pass: each block of text is
+split and reduced with np.unique, so the Python-level work is per distinct
+type in the block rather than per token. Counting is np.bincount over the
+id arrays.
+
+Run:
+  python corpus_stats.py
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+# -------------------------
+# Config
+# -------------------------
+TOKEN_DIR = Path("tokens")
+OUT_DIR = Path("stats")
+
+# Characters read per block while streaming a token file
+BLOCK_CHARS = 1 << 20
+
+TOP_N = 50
+
+# A term "emerges" in year t if absent in t-1 and seen >= EMERGE_MIN_COUNT in t
+EMERGE_MIN_COUNT = 5
+
+# Zipf fit uses ranks 1..ZIPF_MAX_RANK (the long hapax tail is flat and noisy)
+ZIPF_MAX_RANK = 5000
+
+
+# -------------------------
+# Encoding
+# -------------------------
+def year_from_token_file(p: Path) -> str:
+    return p.name.split(".")[0]
+
+
+def iter_token_blocks(path: Path, block_chars: int = BLOCK_CHARS) -> Iterator[List[str]]:
+    """
+    Stream a token file as lists of tokens without loading it whole.
+    A token cut by a block boundary is carried into the next block.
+    """
+    carry = ""
+    with path.open("r", encoding="utf-8") as f:
+        while True:
+            block = f.read(block_chars)
+            if not block:
+                break
+            block = carry + block
+            if block[-1].isspace():
+                carry = ""
+                toks = block.split()
+            else:
+                toks = block.split()
+                carry = toks.pop() if toks else ""
+            if toks:
+                yield toks
+    if carry:
+        yield [carry]
+
+
+class Vocab:
+    """
+    Growing token <-> id mapping shared across years.
+    """
+
+    def __init__(self, tokens: List[str] = None) -> None:
+        self.itos: List[str] = []
+        self.stoi: Dict[str, int] = {}
+        for t in tokens or []:
+            self.add(t)
+
+    def __len__(self) -> int:
+        return len(self.itos)
+
+    def add(self, token: str) -> int:
+        i = self.stoi.get(token)
+        if i is None:
+            i = len(self.itos)
+            self.stoi[token] = i
+            self.itos.append(token)
+        return i
+
+    def encode_block(self, toks: List[str]) -> np.ndarray:
+        uniq, inverse = np.unique(np.asarray(toks), return_inverse=True)
+        local = np.fromiter((self.add(t) for t in uniq.tolist()), dtype=np.uint32, count=len(uniq))
+        return local[inverse.ravel()]
+
+    def save(self, path: Path) -> None:
+        path.write_text("\n".join(self.itos) + "\n", encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "Vocab":
+        v = cls()
+        v.itos = path.read_text(encoding="utf-8").split("\n")[:-1]
+        v.stoi = {t: i for i, t in enumerate(v.itos)}
+        return v
+
+
+def encode_file(path: Path, vocab: Vocab) -> np.ndarray:
+    parts = [vocab.encode_block(toks) for toks in iter_token_blocks(path)]
+    if not parts:
+        return np.zeros(0, dtype=np.uint32)
+    return np.concatenate(parts)
+
+
+def encode_corpus(token_dir: Path = TOKEN_DIR) -> Tuple[Vocab, Dict[str, np.ndarray]]:
+    """
+    Integer-encode every year file against one shared vocabulary.
+    """
+    files = sorted(token_dir.glob("*.tokens.txt"))
+    if not files:
+        raise SystemExit(f"No .tokens.txt files found in {token_dir.resolve()}")
+
+    vocab = Vocab()
+    ids: Dict[str, np.ndarray] = {}
+    for p in files:
+        ids[year_from_token_file(p)] = encode_file(p, vocab)
+    return vocab, ids
+
+
+def frequency_matrix(ids: Dict[str, np.ndarray], vocab_size: int) -> Tuple[List[str], np.ndarray]:
+    years = sorted(ids)
+    counts = np.zeros((len(years), vocab_size), dtype=np.int32)
+    for row, y in enumerate(years):
+        counts[row] = np.bincount(ids[y], minlength=vocab_size)
+    return years, counts
+
+
+def load_stats(out_dir: Path = OUT_DIR) -> Tuple[Vocab, List[str], np.ndarray]:
+    """
+    Load the shared vocabulary and the years x vocab frequency matrix.
+    """
+    vocab = Vocab.load(out_dir / "vocab.txt")
+    data = np.load(out_dir / "freq.npz")
+    return vocab, [str(y) for y in data["years"]], data["counts"]
+
+
+def load_ids(year: str, out_dir: Path = OUT_DIR) -> np.ndarray:
+    return np.load(out_dir / f"{year}.ids.npy")
+
+
+# -------------------------
+# Statistics
+# -------------------------
+def zipf_fit(row: np.ndarray, max_rank: int = ZIPF_MAX_RANK) -> Tuple[float, float]:
+    """
+    Least-squares fit of log f = c - s log r. Returns (s, R^2).
+    """
+    freqs = np.sort(row[row > 0])[::-1][:max_rank].astype(np.float64)
+    if len(freqs) < 2:
+        return float("nan"), float("nan")
+    x = np.log(np.arange(1, len(freqs) + 1))
+    y = np.log(freqs)
+    slope, intercept = np.polyfit(x, y, 1)
+    resid = y - (slope * x + intercept)
+    r2 = 1.0 - resid.var() / y.var()
+    return float(-slope), float(r2)
+
+
+def year_summary(counts: np.ndarray) -> np.ndarray:
+    """
+    Per-year columns: tokens, types, hapax.
+    """
+    tokens = counts.sum(axis=1)
+    types = (counts > 0).sum(axis=1)
+    hapax = (counts == 1).sum(axis=1)
+    return np.stack([tokens, types, hapax], axis=1)
+
+
+def emerging_terms(counts: np.ndarray, min_count: int = EMERGE_MIN_COUNT) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    For each consecutive year pair (t-1, t) return (t, emerged ids, disappeared ids),
+    each sorted by frequency in the year where the term is present.
+    """
+    out = []
+    for t in range(1, counts.shape[0]):
+        prev, cur = counts[t - 1], counts[t]
+        emerged = np.flatnonzero((prev == 0) & (cur >= min_count))
+        gone = np.flatnonzero((prev >= min_count) & (cur == 0))
+        emerged = emerged[np.argsort(-cur[emerged], kind="stable")]
+        gone = gone[np.argsort(-prev[gone], kind="stable")]
+        out.append((t, emerged, gone))
+    return out
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    vocab, ids = encode_corpus(TOKEN_DIR)
+    years, counts = frequency_matrix(ids, len(vocab))
+
+    vocab.save(OUT_DIR / "vocab.txt")
+    np.savez_compressed(OUT_DIR / "freq.npz", years=np.array(years), counts=counts)
+    for y in years:
+        np.save(OUT_DIR / f"{y}.ids.npy", ids[y])
+
+    summary = year_summary(counts)
+    lines = ["year\ttokens\ttypes\thapax\tttr\tzipf_s\tzipf_r2"]
+    print(f"{'year':6s} {'tokens':>9s} {'types':>7s} {'hapax':>7s} {'ttr':>6s} {'zipf_s':>7s} {'r2':>5s}")
+    for row, y in enumerate(years):
+        n_tok, n_typ, n_hap = (int(v) for v in summary[row])
+        ttr = n_typ / max(1, n_tok)
+        s, r2 = zipf_fit(counts[row])
+        lines.append(f"{y}\t{n_tok}\t{n_typ}\t{n_hap}\t{ttr:.4f}\t{s:.3f}\t{r2:.3f}")
+        print(f"{y:6s} {n_tok:9d} {n_typ:7d} {n_hap:7d} {ttr:6.3f} {s:7.3f} {r2:5.3f}")
+    (OUT_DIR / "summary.tsv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    lines = ["year\trank\ttoken\tcount\tper_10k"]
+    for row, y in enumerate(years):
+        top = np.argsort(-counts[row], kind="stable")[:TOP_N]
+        total = max(1, int(summary[row, 0]))
+        for rank, i in enumerate(top, start=1):
+            c = int(counts[row, i])
+            lines.append(f"{y}\t{rank}\t{vocab.itos[i]}\t{c}\t{c * 1e4 / total:.2f}")
+    (OUT_DIR / "top.tsv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    lines = ["year\tkind\ttoken\tcount"]
+    for t, emerged, gone in emerging_terms(counts):
+        for i in emerged:
+            lines.append(f"{years[t]}\temerged\t{vocab.itos[i]}\t{int(counts[t, i])}")
+        for i in gone:
+            lines.append(f"{years[t]}\tdisappeared\t{vocab.itos[i]}\t{int(counts[t - 1, i])}")
+        print(f"{years[t - 1]}->{years[t]}: emerged={len(emerged)} disappeared={len(gone)}")
+    (OUT_DIR / "emerging.tsv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    print("wrote", OUT_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Near-duplicate paragraph detection across years (MinHash + LSH)
+
+Input:
+  ./txt_clean_norm/[year].norm.txt   (output of norm.py; one paragraph per line)
+Output:
+  ./txt_dedup/[year].dedup.txt       input with duplicate paragraphs removed
+                                     (SOURCE/PAGE markers kept)
+  ./txt_dedup/duplicates.tsv         every dropped paragraph and the one kept
+
+Paragraphs of at least MIN_CHARS characters are shingled into character
+SHINGLE-grams. MinHash signatures (NUM_PERM universal hashes) are computed
+for all paragraphs at once with NumPy (min over shingles via
+np.minimum.reduceat), then split into BANDS bands; paragraphs sharing a
+band bucket are candidates, and candidates whose signatures agree on at
+least THRESHOLD of the positions are linked. In each linked group the
+first occurrence (earliest year, then position) is kept.
+
+Run:
+  python dedup.py
+  python dedup.py --flag-only      # report only, write nothing but duplicates.tsv
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from norm import is_headlike
+
+
+# -------------------------
+# Config
+# -------------------------
+IN_DIR = Path("txt_clean_norm")
+OUT_DIR = Path("txt_dedup")
+
+MIN_CHARS = 50
+SHINGLE = 5
+NUM_PERM = 128
+BANDS = 32                 # rows per band = NUM_PERM // BANDS
+THRESHOLD = 0.8            # estimated Jaccard similarity to count as duplicate
+FLAG_ONLY = False
+SEED = 1
+
+# Signatures are computed over batches of BATCH_SHINGLES shingles and
+# PERM_BLOCK permutations at a time; each temporary is a
+# (PERM_BLOCK, BATCH_SHINGLES) uint64 array, about 8 MB
+BATCH_SHINGLES = 1 << 15
+PERM_BLOCK = 32
+
+PRIME = (1 << 31) - 1
+
+
+# -------------------------
+# Paragraphs
+# -------------------------
+class Paragraph:
+    __slots__ = ("year", "line_no", "text")
+
+    def __init__(self, year: str, line_no: int, text: str) -> None:
+        self.year = year
+        self.line_no = line_no
+        self.text = text
+
+
+def load_paragraphs(in_dir: Path = IN_DIR) -> Tuple[Dict[str, List[str]], List[Paragraph]]:
+    files = sorted(in_dir.glob("*.norm.txt"))
+    if not files:
+        raise SystemExit(f"No .norm.txt files found in {in_dir.resolve()} (run norm.py first)")
+
+    lines_by_year: Dict[str, List[str]] = {}
+    paras: List[Paragraph] = []
+    for p in files:
+        year = p.name.split(".")[0]
+        lines = p.read_text(encoding="utf-8").splitlines()
+        lines_by_year[year] = lines
+        for i, line in enumerate(lines):
+            line = line.strip()
+            if len(line) >= MIN_CHARS and not is_headlike(line):
+                paras.append(Paragraph(year, i, line))
+    return lines_by_year, paras
+
+
+# -------------------------
+# MinHash
+# -------------------------
+def shingle_hashes(text: str, k: int = SHINGLE) -> np.ndarray:
+    """
+    Polynomial hashes (mod PRIME) of all character k-grams.
+    """
+    cp = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(cp) < k:
+        cp = np.pad(cp, (0, k - len(cp)))
+    h = np.zeros(len(cp) - k + 1, dtype=np.uint64)
+    for j in range(k):
+        h = (h * np.uint64(1_000_003) + cp[j:len(cp) - k + 1 + j]) % np.uint64(PRIME)
+    return np.unique(h)
+
+
+def minhash_signatures(texts: List[str], num_perm: int = NUM_PERM, seed: int = SEED) -> np.ndarray:
+    """
+    (len(texts), num_perm) MinHash signature matrix.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, num_perm, dtype=np.uint64)[:, None]
+    b = rng.integers(0, PRIME, num_perm, dtype=np.uint64)[:, None]
+
+    sigs = np.empty((len(texts), num_perm), dtype=np.uint64)
+    start = 0
+    while start < len(texts):
+        # gather whole paragraphs until the batch holds BATCH_SHINGLES shingles
+        hs: List[np.ndarray] = []
+        n = 0
+        end = start
+        while end < len(texts) and (n < BATCH_SHINGLES or not hs):
+            hs.append(shingle_hashes(texts[end]))
+            n += len(hs[-1])
+            end += 1
+
+        flat = np.concatenate(hs)
+        bounds = np.concatenate(([0], np.cumsum([len(h) for h in hs])[:-1]))
+        for p in range(0, num_perm, PERM_BLOCK):
+            permuted = (a[p:p + PERM_BLOCK] * flat[None, :] + b[p:p + PERM_BLOCK]) % np.uint64(PRIME)
+            sigs[start:end, p:p + PERM_BLOCK] = np.minimum.reduceat(permuted, bounds, axis=1).T
+        start = end
+    return sigs
+
+
+# -------------------------
+# LSH
+# -------------------------
+def candidate_pairs(sigs: np.ndarray, bands: int = BANDS) -> np.ndarray:
+    """
+    Unique (i, j), i < j, pairs sharing at least one band bucket.
+    """
+    rows = sigs.shape[1] // bands
+    pairs: List[np.ndarray] = []
+    for band in range(bands):
+        block = np.ascontiguousarray(sigs[:, band * rows:(band + 1) * rows])
+        _, bucket = np.unique(block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel(), return_inverse=True)
+        order = np.argsort(bucket, kind="stable")
+        sorted_b = bucket[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_b[1:] != sorted_b[:-1])))
+        sizes = np.diff(np.concatenate((starts, [len(order)])))
+        for s, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = order[s:s + size]
+            i, j = np.triu_indices(size, k=1)
+            pairs.append(np.stack([members[i], members[j]], axis=1))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    allp = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(allp, axis=0)
+
+
+def find_duplicates(sigs: np.ndarray, threshold: float = THRESHOLD) -> Dict[int, int]:
+    """
+    Map each duplicate paragraph index to the index kept for its group
+    (the smallest index, i.e. first in year/line order).
+    """
+    pairs = candidate_pairs(sigs)
+    if len(pairs):
+        sim = (sigs[pairs[:, 0]] == sigs[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[sim >= threshold]
+
+    parent = list(range(len(sigs)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs.tolist():
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    return {i: find(i) for i in range(len(sigs)) if find(i) != i}
+
+
+# -------------------------
+# Main
+# -------------------------
+def count_tokens(texts: List[str], tokenizer) -> int:
+    from tokenise import get_split_mode, iter_chunks_by_paragraph
+
+    mode = get_split_mode(tokenizer)
+    return sum(len(tokenizer.tokenize(c, mode)) for t in texts for c in iter_chunks_by_paragraph(t))
+
+
+def main() -> None:
+    from sudachipy import dictionary
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    lines_by_year, paras = load_paragraphs(IN_DIR)
+    t1 = time.perf_counter()
+    sigs = minhash_signatures([p.text for p in paras])
+    t2 = time.perf_counter()
+    dups = find_duplicates(sigs, THRESHOLD)
+    t3 = time.perf_counter()
+
+    print(f"paragraphs={len(paras)} duplicates={len(dups)}")
+    print(f"load {t1 - t0:.2f}s  minhash {t2 - t1:.2f}s  lsh {t3 - t2:.2f}s  "
+          f"({len(paras) / max(t3 - t1, 1e-9):.0f} paragraphs/s)")
+
+    lines = ["year\tline\tkept_year\tkept_line\tchars\ttext"]
+    drop: Dict[str, set] = {y: set() for y in lines_by_year}
+    removed: Dict[str, List[str]] = {y: [] for y in lines_by_year}
+    for i, k in sorted(dups.items()):
+        p, kept = paras[i], paras[k]
+        drop[p.year].add(p.line_no)
+        removed[p.year].append(p.text)
+        lines.append(f"{p.year}\t{p.line_no + 1}\t{kept.year}\t{kept.line_no + 1}\t{len(p.text)}\t{p.text[:60]}")
+    (OUT_DIR / "duplicates.tsv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    tokenizer = dictionary.Dictionary().create()
+    print(f"\n{'year':6s} {'paras':>6s} {'chars':>8s} {'tokens':>8s}")
+    for year in sorted(lines_by_year):
+        n_tok = count_tokens(removed[year], tokenizer)
+        n_chars = sum(len(t) for t in removed[year])
+        print(f"{year:6s} {len(removed[year]):6d} {n_chars:8d} {n_tok:8d}")
+
+    if FLAG_ONLY:
+        print("wrote", OUT_DIR / "duplicates.tsv")
+        return
+
+    for year, year_lines in sorted(lines_by_year.items()):
+        kept_lines = [ln for i, ln in enumerate(year_lines) if i not in drop[year]]
+        out = OUT_DIR / f"{year}.dedup.txt"
+        out.write_text("\n".join(kept_lines) + "\n", encoding="utf-8")
+        print("wrote", out)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="MinHash/LSH near-duplicate paragraph removal")
+    ap.add_argument("--flag-only", action="store_true")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = ap.parse_args()
+    FLAG_ONLY = FLAG_ONLY or args.flag_only
+    THRESHOLD = args.threshold
+    main()
@@ -0,0 +1,163 @@
+"""
+Per-stage timing, memory and throughput records for pipeline runs
+
+Usage in a script:
+
+    report = RunReport("tokenise")
+    for year ...:
+        with report.stage("tokenise", year) as st:
+            ...
+            st.add(bytes=n_bytes, tokens=n_tokens)
+    report.save()
+
+Each stage records wall time, CPU time, peak RSS during the stage and the
+given counts with their rates (tokens_per_s, ...). save() writes
+reports/<script>_<timestamp>/report.json; with PROFILE = True every stage
+also runs under cProfile and its stats are written to the same directory
+as <stage>_<year>.prof (open with `python -m pstats` or snakeviz).
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# -------------------------
+# Config
+# -------------------------
+REPORT_DIR = Path("reports")
+PROFILE = False
+
+
+# -------------------------
+# Memory
+# -------------------------
+def reset_peak_rss() -> bool:
+    """
+    Reset the kernel's peak-RSS watermark (Linux only). Returns False if
+    unsupported, in which case peaks are process-lifetime peaks.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak RSS in MB, or None where neither /proc nor the resource module
+    is available (Windows).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# -------------------------
+# Records
+# -------------------------
+class StageRecord:
+    def __init__(self, name: str, year: Optional[str]) -> None:
+        self.name = name
+        self.year = year
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss_mb: Optional[float] = None
+        self.counts: Dict[str, float] = {}
+        self.profile: Optional[str] = None
+
+    def add(self, **counts: float) -> None:
+        for k, v in counts.items():
+            self.counts[k] = self.counts.get(k, 0) + v
+
+    def as_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {
+            "stage": self.name,
+            "year": self.year,
+            "wall_s": round(self.wall, 4),
+            "cpu_s": round(self.cpu, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+        }
+        for k, v in self.counts.items():
+            d[k] = v
+            d[f"{k}_per_s"] = round(v / self.wall, 1) if self.wall > 0 else None
+        if self.profile:
+            d["profile"] = self.profile
+        return d
+
+
+class RunReport:
+    def __init__(self, script: str) -> None:
+        self.script = script
+        self.started = time.strftime("%Y%m%d-%H%M%S")
+        self.out_dir = REPORT_DIR / f"{script}_{self.started}"
+        self.stages: List[StageRecord] = []
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str, year: Optional[str] = None) -> Iterator[StageRecord]:
+        rec = StageRecord(name, year)
+        reset_peak_rss()
+        prof = cProfile.Profile() if PROFILE else None
+
+        t0, c0 = time.perf_counter(), time.process_time()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield rec
+        finally:
+            if prof is not None:
+                prof.disable()
+            rec.wall = time.perf_counter() - t0
+            rec.cpu = time.process_time() - c0
+            rec.peak_rss_mb = peak_rss_mb()
+            if prof is not None:
+                self.out_dir.mkdir(parents=True, exist_ok=True)
+                path = self.out_dir / (f"{name}_{year}.prof" if year else f"{name}.prof")
+                prof.dump_stats(str(path))
+                rec.profile = path.name
+            self.stages.append(rec)
+
+    def as_dict(self) -> Dict[str, Any]:
+        peaks = [p for p in [peak_rss_mb()] + [s.peak_rss_mb for s in self.stages] if p is not None]
+        return {
+            "script": self.script,
+            "started": self.started,
+            "argv": sys.argv,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "total_wall_s": round(time.perf_counter() - self._t0, 4),
+            "total_cpu_s": round(time.process_time() - self._c0, 4),
+            "peak_rss_mb": round(max(peaks), 1) if peaks else None,
+            "profiled": PROFILE,
+            "stages": [s.as_dict() for s in self.stages],
+        }
+
+    def save(self) -> Path:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / "report.json"
+        path.write_text(json.dumps(self.as_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        print("report:", path)
+        return path
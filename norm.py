@@ -1,9 +1,16 @@
 import re
 from pathlib import Path
 
+from pagediff import Recorder
+
 IN_DIR = Path("txt_clean")
 OUT_DIR = Path("txt_clean_norm")
-OUT_DIR.mkdir(exist_ok=True)
+
+# 段落単位の Parquet（dataset/norm/）も書き出す（paragraphs.py、pyarrow が必要）
+WRITE_PARQUET = False
+
+# 出力のページごとのハッシュを runs/norm/ に記録する（pagediff.py で実行間の差分を見る）
+RECORD_PAGES = True
 
 # 文末として扱う記号（ここで終わっていれば文が閉じている可能性が高い）
 SENT_END = "。！？）」』】］〉》）"
@@ -72,9 +79,35 @@ def normalize_breaks(text: str) -> str:
     joined = re.sub(r"\n{3,}", "\n\n", joined)
     return joined.strip() + "\n"
 
-for p in sorted(IN_DIR.glob("*.clean.txt")):
-    t = p.read_text(encoding="utf-8", errors="ignore")
-    norm = normalize_breaks(t)
-    out = OUT_DIR / p.name.replace(".clean.txt", ".norm.txt")
-    out.write_text(norm, encoding="utf-8")
-    print("wrote", out)
\ No newline at end of file
+def main() -> None:
+    OUT_DIR.mkdir(exist_ok=True)
+
+    tokenizer = None
+    if WRITE_PARQUET:
+        import paragraphs
+
+        paragraphs.require_pyarrow()
+        tokenizer = paragraphs.make_tokenizer()
+
+    recorder = Recorder("norm") if RECORD_PAGES else None
+    for p in sorted(IN_DIR.glob("*.clean.txt")):
+        t = p.read_text(encoding="utf-8", errors="ignore")
+        norm = normalize_breaks(t)
+        out = OUT_DIR / p.name.replace(".clean.txt", ".norm.txt")
+        out.write_text(norm, encoding="utf-8")
+        print("wrote", out)
+
+        year = p.name.replace(".clean.txt", "")
+        if recorder is not None:
+            recorder.add(year, norm)
+
+        if WRITE_PARQUET:
+            n = paragraphs.write_year("norm", year, norm, tokenizer)
+            print("wrote", paragraphs.DATASET_DIR / "norm" / f"year={year}", f"({n} paragraphs)")
+
+    if recorder is not None:
+        print("pages recorded:", recorder.dir)
+
+
+if __name__ == "__main__":
+    main()
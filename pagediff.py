@@ -0,0 +1,263 @@
+"""
+Per-page content hashes of raw/clean/norm output, and a diff between runs
+
+Every extract / clean / norm run records its output page by page:
+
+  runs/objects/ab/cdef...     zlib-compressed page text, named by its
+                              BLAKE2b hash (shared by all runs, so an
+                              unchanged page is stored once)
+  runs/<kind>/<run>/<year>.json
+                              [[source, page, hash, lines], ...] in file order
+
+kind is raw (txt_raw/), clean (txt_clean/) or norm (txt_clean_norm/); run
+is the start time (YYYYmmdd-HHMMSS, the same as the run's reports/ dir).
+Pages are the text between `### SOURCE: ... ###` / `## PAGE n ##` markers
+and are matched across runs by (source, page).
+
+Comparing two runs reads only the small index files; pages whose hash
+differs are decompressed and diffed line by line (multiset of stripped
+lines), so a change to is_tableish or normalize_breaks is evaluated over
+the whole corpus in seconds:
+
+  year  pages  changed  dropped  added
+
+Run:
+  python pagediff.py clean --record          # record the current txt_clean/ as a run
+  python pagediff.py clean                   # latest run vs the one before
+  python pagediff.py norm 20260101-120000 20260102-093000 --show 3 --years 2019
+  python pagediff.py clean --list
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import hashlib
+import json
+import re
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# -------------------------
+# Config
+# -------------------------
+RUNS_DIR = Path("runs")
+OBJECT_DIR = RUNS_DIR / "objects"
+
+# kind -> (output dir, file suffix); the year is the file name without the suffix
+KINDS = {
+    "raw": (Path("txt_raw"), ".txt"),
+    "clean": (Path("txt_clean"), ".clean.txt"),
+    "norm": (Path("txt_clean_norm"), ".norm.txt"),
+}
+
+SHOW = 0             # unified diffs printed for the first SHOW changed pages
+CONTEXT_LINES = 1
+
+MARKER_PAT = re.compile(r"^\s*(?:###\s*SOURCE:\s*(.+?)\s*###|##\s*PAGE\s+(\d+)\s*##)\s*$")
+
+PageKey = Tuple[str, int]
+
+
+# -------------------------
+# Pages and objects
+# -------------------------
+def iter_pages(text: str) -> Iterator[Tuple[str, int, str]]:
+    """
+    Yield (source, page, page text) in file order; text before the first
+    PAGE marker of a source is page 0.
+    """
+    source, page = "", 0
+    buf: List[str] = []
+    for line in text.split("\n"):
+        m = MARKER_PAT.match(line)
+        if not m:
+            buf.append(line)
+            continue
+        if any(s.strip() for s in buf):
+            yield source, page, "\n".join(buf).strip("\n")
+        buf = []
+        if m.group(1) is not None:
+            source, page = m.group(1), 0
+        else:
+            page = int(m.group(2))
+    if any(s.strip() for s in buf):
+        yield source, page, "\n".join(buf).strip("\n")
+
+
+def page_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def object_path(h: str) -> Path:
+    return OBJECT_DIR / h[:2] / h[2:]
+
+
+def load_page(h: str) -> str:
+    return zlib.decompress(object_path(h).read_bytes()).decode("utf-8")
+
+
+# -------------------------
+# Recording
+# -------------------------
+class Recorder:
+    """
+    Records one run of a kind: rec = Recorder("clean"); rec.add(year, text).
+    """
+
+    def __init__(self, kind: str, run: Optional[str] = None) -> None:
+        self.kind = kind
+        run = run or time.strftime("%Y%m%d-%H%M%S")
+        self.run, n = run, 1
+        while (RUNS_DIR / kind / self.run).exists():
+            n += 1
+            self.run = f"{run}-{n}"
+        self.dir = RUNS_DIR / kind / self.run
+
+    def add(self, year: str, text: str) -> int:
+        """
+        Store the pages of one year's output; returns the number of new objects.
+        """
+        self.dir.mkdir(parents=True, exist_ok=True)
+        index, new = [], 0
+        for source, page, body in iter_pages(text):
+            h = page_hash(body)
+            path = object_path(h)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(zlib.compress(body.encode("utf-8"), 6))
+                new += 1
+            index.append([source, page, h, body.count("\n") + 1])
+        (self.dir / f"{year}.json").write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+        return new
+
+
+def record_outputs(kind: str) -> Recorder:
+    """
+    Record the current output files of a kind as a run.
+    """
+    out_dir, suffix = KINDS[kind]
+    files = sorted(out_dir.glob(f"*{suffix}"))
+    if not files:
+        raise SystemExit(f"No {suffix} files found in {out_dir.resolve()}")
+    rec = Recorder(kind)
+    for p in files:
+        rec.add(p.name[:-len(suffix)], p.read_text(encoding="utf-8", errors="ignore"))
+    return rec
+
+
+# -------------------------
+# Diff
+# -------------------------
+def list_runs(kind: str) -> List[str]:
+    d = RUNS_DIR / kind
+    return sorted(p.name for p in d.iterdir() if p.is_dir()) if d.exists() else []
+
+
+def load_index(kind: str, run: str) -> Dict[str, Dict[PageKey, Tuple[str, int]]]:
+    """
+    year -> {(source, page): (hash, lines)}
+    """
+    out: Dict[str, Dict[PageKey, Tuple[str, int]]] = {}
+    for p in sorted((RUNS_DIR / kind / run).glob("*.json")):
+        out[p.stem] = {(s, pg): (h, n) for s, pg, h, n in json.loads(p.read_text(encoding="utf-8"))}
+    return out
+
+
+def line_changes(old: str, new: str) -> Tuple[int, int]:
+    """
+    (lines dropped, lines added) between two page texts, as a multiset of
+    stripped non-empty lines (moved lines count as unchanged).
+    """
+    a = Counter(ln.strip() for ln in old.split("\n") if ln.strip())
+    b = Counter(ln.strip() for ln in new.split("\n") if ln.strip())
+    return sum((a - b).values()), sum((b - a).values())
+
+
+def diff_runs(kind: str, run_a: str, run_b: str, years: Optional[List[str]] = None,
+              show: int = SHOW) -> List[Dict[str, object]]:
+    """
+    Per-year page/line change counts from run_a to run_b. Unified diffs of
+    the first `show` changed pages are printed.
+    """
+    a, b = load_index(kind, run_a), load_index(kind, run_b)
+    rows = []
+    for year in sorted(set(a) | set(b)):
+        if years and year not in years:
+            continue
+        pa, pb = a.get(year, {}), b.get(year, {})
+        changed = dropped = added = 0
+        for key in list(pa) + [k for k in pb if k not in pa]:
+            ha, hb = pa.get(key), pb.get(key)
+            if ha is not None and hb is not None and ha[0] == hb[0]:
+                continue
+            changed += 1
+            old = load_page(ha[0]) if ha else ""
+            new = load_page(hb[0]) if hb else ""
+            d, n = line_changes(old, new)
+            dropped += d
+            added += n
+            if show > 0:
+                show -= 1
+                label = f"{year} {key[0]} p{key[1]}"
+                print("".join(difflib.unified_diff(
+                    old.splitlines(keepends=True), new.splitlines(keepends=True),
+                    f"{run_a} {label}", f"{run_b} {label}", n=CONTEXT_LINES,
+                )), end="\n")
+        rows.append({"year": year, "pages": len(set(pa) | set(pb)), "changed": changed,
+                     "dropped": dropped, "added": added})
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Per-page hashes of pipeline output and diffs between runs")
+    ap.add_argument("kind", choices=list(KINDS))
+    ap.add_argument("runs", nargs="*", help="two run ids (default: the last two runs)")
+    ap.add_argument("--record", action="store_true", help="record the current output files as a run")
+    ap.add_argument("--list", action="store_true", help="list recorded runs")
+    ap.add_argument("--years", nargs="+")
+    ap.add_argument("--show", type=int, default=SHOW, help="print unified diffs of the first N changed pages")
+    args = ap.parse_args()
+
+    if args.record:
+        rec = record_outputs(args.kind)
+        print("recorded", rec.dir)
+        return
+
+    runs = list_runs(args.kind)
+    if args.list:
+        print("\n".join(runs))
+        return
+
+    if len(args.runs) == 2:
+        run_a, run_b = args.runs
+    elif len(args.runs) == 1:
+        run_a, run_b = args.runs[0], runs[-1] if runs else ""
+    elif len(runs) >= 2:
+        run_a, run_b = runs[-2:]
+    else:
+        raise SystemExit(f"Need two recorded {args.kind} runs in {(RUNS_DIR / args.kind).resolve()} "
+                         f"(run the stage, or `python pagediff.py {args.kind} --record`)")
+    for r in (run_a, run_b):
+        if r not in runs:
+            raise SystemExit(f"Unknown {args.kind} run: {r}")
+
+    t0 = time.perf_counter()
+    rows = diff_runs(args.kind, run_a, run_b, args.years, args.show)
+    sec = time.perf_counter() - t0
+
+    print(f"{args.kind}: {run_a} -> {run_b}")
+    print(f"{'year':6s} {'pages':>6s} {'changed':>8s} {'dropped':>8s} {'added':>8s}")
+    for r in rows:
+        print(f"{r['year']:6s} {r['pages']:6d} {r['changed']:8d} {r['dropped']:8d} {r['added']:8d}")
+    total = {k: sum(r[k] for r in rows) for k in ("pages", "changed", "dropped", "added")}
+    print(f"{'total':6s} {total['pages']:6d} {total['changed']:8d} {total['dropped']:8d} {total['added']:8d}")
+    print(f"({sec:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Paragraph-level columnar dataset (Parquet, partitioned by year)
+
+Input:
+  ./txt_clean/[year].clean.txt        (pdftotxt.py)  or
+  ./txt_clean_norm/[year].norm.txt    (norm.py)
+Output:
+  ./dataset/clean/year=YYYY/*.parquet
+  ./dataset/norm/year=YYYY/*.parquet
+
+One row per paragraph:
+  year     partition key (string)
+  source   source PDF name (from the ### SOURCE ### marker)
+  page     page number (from the ## PAGE n ## marker)
+  para     paragraph index within the year file
+  text     paragraph text
+  chars    characters
+  tokens   Sudachi token count (tokenise.SPLIT_MODE; -1 if not counted)
+
+In norm output every non-marker line is a paragraph; in clean output a
+paragraph is a run of lines between blank lines / markers, joined
+without separator (Japanese text) -- clean text has few blank lines, so
+these are closer to page blocks. Rows are sorted by (source, page,
+para), so Parquet row-group statistics let readers skip on source and
+page as well as on the year partition.
+
+Selecting a sub-corpus is then a filtered read (only the matching year
+directories are opened and only matching row groups are decoded):
+
+    from paragraphs import read_paragraphs
+    t = read_paragraphs("norm", years=["2019", "2020"], source="1417228 Document.pdf", pages=(10, 20))
+
+pyarrow is an optional dependency, imported only here.
+
+Run:
+  python paragraphs.py norm --build          # from existing txt_clean_norm/
+  python paragraphs.py norm --years 2019 --pages 10 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# -------------------------
+# Config
+# -------------------------
+DATASET_DIR = Path("dataset")
+INPUTS = {
+    "clean": (Path("txt_clean"), ".clean.txt"),
+    "norm": (Path("txt_clean_norm"), ".norm.txt"),
+}
+TOKEN_COUNTS = True
+
+SOURCE_PAT = re.compile(r"^###\s*SOURCE:\s*(.+?)\s*###$")
+PAGE_PAT = re.compile(r"^##\s*PAGE\s+(\d+)\s*##$")
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("The Parquet export needs pyarrow (pip install pyarrow)")
+
+
+def year_partitioning():
+    # explicit string type, otherwise hive discovery reads year=2019 as int32
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("year", pa.string())]), flavor="hive")
+
+
+# -------------------------
+# Paragraphs
+# -------------------------
+def iter_paragraphs(text: str, per_line: bool) -> Iterator[Tuple[str, int, str]]:
+    """
+    Yield (source, page, paragraph text) in file order.
+    """
+    source, page = "", 0
+    buf: List[str] = []
+
+    def flush() -> Iterator[Tuple[str, int, str]]:
+        if buf:
+            yield source, page, "".join(buf)
+            buf.clear()
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        m = SOURCE_PAT.match(line)
+        if m:
+            yield from flush()
+            source, page = m.group(1), 0
+            continue
+        m = PAGE_PAT.match(line)
+        if m:
+            yield from flush()
+            page = int(m.group(1))
+            continue
+        if not line:
+            yield from flush()
+            continue
+        buf.append(line)
+        if per_line:
+            yield from flush()
+    yield from flush()
+
+
+def paragraph_columns(year: str, text: str, per_line: bool, tokenizer=None) -> Dict[str, list]:
+    from tokenise import get_split_mode, iter_chunks_by_paragraph
+
+    mode = get_split_mode(tokenizer) if tokenizer is not None else None
+    cols: Dict[str, list] = {k: [] for k in ("year", "source", "page", "para", "text", "chars", "tokens")}
+    for i, (source, page, para) in enumerate(iter_paragraphs(text, per_line)):
+        cols["year"].append(year)
+        cols["source"].append(source)
+        cols["page"].append(page)
+        cols["para"].append(i)
+        cols["text"].append(para)
+        cols["chars"].append(len(para))
+        if tokenizer is None:
+            cols["tokens"].append(-1)
+        else:
+            cols["tokens"].append(sum(len(tokenizer.tokenize(c, mode)) for c in iter_chunks_by_paragraph(para)))
+    return cols
+
+
+# -------------------------
+# Parquet
+# -------------------------
+def write_year(kind: str, year: str, text: str, tokenizer=None, out_dir: Path = DATASET_DIR) -> int:
+    """
+    Replace the year partition of dataset/<kind>/. Returns the row count.
+    """
+    require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    cols = paragraph_columns(year, text, per_line=(kind == "norm"), tokenizer=tokenizer)
+    table = pa.table({
+        "year": pa.array(cols["year"], pa.string()),
+        "source": pa.array(cols["source"], pa.string()),
+        "page": pa.array(cols["page"], pa.int32()),
+        "para": pa.array(cols["para"], pa.int32()),
+        "text": pa.array(cols["text"], pa.string()),
+        "chars": pa.array(cols["chars"], pa.int32()),
+        "tokens": pa.array(cols["tokens"], pa.int32()),
+    }).sort_by([("source", "ascending"), ("page", "ascending"), ("para", "ascending")])
+
+    ds.write_dataset(
+        table,
+        out_dir / kind,
+        format="parquet",
+        partitioning=year_partitioning(),
+        existing_data_behavior="delete_matching",
+        basename_template=f"{year}-{{i}}.parquet",
+    )
+    return table.num_rows
+
+
+def read_paragraphs(kind: str, years: Optional[Sequence[str]] = None, source: Optional[str] = None,
+                    pages: Optional[Tuple[int, int]] = None, columns: Optional[List[str]] = None,
+                    out_dir: Path = DATASET_DIR):
+    """
+    Filtered read of dataset/<kind>/ as a pyarrow Table. pages is inclusive.
+    """
+    require_pyarrow()
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(out_dir / kind, format="parquet", partitioning=year_partitioning())
+    cond = None
+    for expr in (
+        ds.field("year").isin(list(years)) if years else None,
+        ds.field("source") == source if source else None,
+        (ds.field("page") >= pages[0]) & (ds.field("page") <= pages[1]) if pages else None,
+    ):
+        if expr is not None:
+            cond = expr if cond is None else cond & expr
+    return dataset.to_table(columns=columns, filter=cond)
+
+
+def build(kind: str, tokenizer=None, out_dir: Path = DATASET_DIR) -> None:
+    """
+    (Re)build dataset/<kind>/ from the existing text files.
+    """
+    in_dir, suffix = INPUTS[kind]
+    files = sorted(in_dir.glob(f"*{suffix}"))
+    if not files:
+        raise SystemExit(f"No {suffix} files found in {in_dir.resolve()}")
+    for p in files:
+        year = p.name[:-len(suffix)]
+        n = write_year(kind, year, p.read_text(encoding="utf-8"), tokenizer, out_dir)
+        print(f"wrote {out_dir / kind}/year={year} ({n} paragraphs)")
+
+
+def make_tokenizer():
+    """
+    Sudachi tokenizer for the token column, or None if TOKEN_COUNTS is off.
+    """
+    if not TOKEN_COUNTS:
+        return None
+    from sudachipy import dictionary
+
+    return dictionary.Dictionary().create()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Paragraph-level Parquet dataset")
+    ap.add_argument("kind", choices=list(INPUTS))
+    ap.add_argument("--build", action="store_true", help="(re)build from the text files")
+    ap.add_argument("--no-tokens", action="store_true", help="skip Sudachi token counts when building")
+    ap.add_argument("--years", nargs="+")
+    ap.add_argument("--source")
+    ap.add_argument("--pages", nargs=2, type=int)
+    ap.add_argument("--limit", type=int, default=10)
+    args = ap.parse_args()
+
+    if args.build:
+        build(args.kind, None if args.no_tokens else make_tokenizer())
+        return
+
+    table = read_paragraphs(args.kind, args.years, args.source, tuple(args.pages) if args.pages else None)
+    print(f"{table.num_rows} paragraphs, {sum(table['chars'].to_pylist())} chars")
+    for row in table.slice(0, args.limit).to_pylist():
+        print(f"{row['year']} {row['source']} p{row['page']} #{row['para']} ({row['tokens']} tok) {row['text'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
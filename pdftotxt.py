@@ -83,8 +83,10 @@
 
 """
 Science/Innovation Whitepaper PDF -> year-level corpus text extractor (JP)
-- Handles 1-column and 2-column layouts (auto-detect per page)
-- Extracts text blocks with coordinates using PyMuPDF (fitz)
+- Handles multi-column layouts, spanning headings and sidebars (column
+  gutters from x-coverage histograms, per page)
+- Extracts text blocks with coordinates using PyMuPDF (fitz) or pdfminer.six
+  (BACKEND; compare them with `python -m benchmarks.bench_extract`)
 - Orders blocks to reduce 2-column jumbling
 - Writes:
   - txt_raw/YYYY.txt   (includes SOURCE markers per input PDF)
@@ -103,9 +105,12 @@ Run:
 import re
 import time
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Callable, Dict, Iterator, List, Set, Tuple
 
-import fitz  # PyMuPDF
+import numpy as np
+
+from instrument import RunReport
+from pagediff import Recorder
 
 
 # -------------------------
@@ -116,6 +121,31 @@ OUT_RAW = Path("txt_raw")       # year-level raw text
 OUT_CLEAN = Path("txt_clean")   # year-level cleaned text
 SLEEP_BETWEEN_PDFS = 0.0        # adjust if you want to be gentle on IO
 
+# Text extraction backend (see BACKENDS): "blocks" | "words" | "pdfminer"
+BACKEND = "blocks"
+
+# Block ordering: "columns" (gutters from x-coverage histograms, see
+# reading_order) | "midline" (previous 1/2-column split at the page centre)
+LAYOUT = "columns"
+WIDE_RATIO = 0.6        # boxes this share of the region's text width span its columns
+MIN_GUTTER = 6          # pt
+GUTTER_FRAC = 0.15      # gutter coverage relative to the band's peak coverage
+GUTTER_TOL = 2          # pt a box may reach into a gutter without straddling it
+SIDEBAR_SHARE = 0.1     # columns with less of the band's text are read last
+
+# Record per-page hashes of the raw/clean output under runs/ (pagediff.py)
+RECORD_PAGES = True
+
+# Also write cleaned paragraphs to dataset/clean/ as Parquet (paragraphs.py; needs pyarrow)
+WRITE_PARQUET = False
+
+# Running heads / page numbers: lines among the first/last EDGE_LINES of a
+# page that recur (digits ignored) on enough pages of the same PDF are dropped
+STRIP_REPEATED_EDGES = True
+EDGE_LINES = 2
+REPEAT_MIN_PAGES = 2
+REPEAT_MIN_RATIO = 0.25
+
 
 # -------------------------
 # Helpers: year inference
@@ -168,31 +198,155 @@ def detect_columns(text_blocks: List[Tuple], page_width: float) -> int:
     return 1
 
 
-def blocks_to_lines(blocks: List[Tuple], page_width: float) -> List[str]:
+def midline_order(text_blocks: List[Tuple], page_width: float) -> List[Tuple]:
     """
-    Convert blocks to ordered lines.
+    Previous ordering (LAYOUT = "midline"):
     - If 1-column: order by (y0, x0)
     - If 2-column: split by midline, order left then right, each by (y0, x0)
     """
+    col_count = detect_columns(text_blocks, page_width)
+
+    if col_count == 1:
+        return sorted(text_blocks, key=lambda b: (b[1], b[0]))  # (y0, x0)
+
+    mid = page_width / 2
+    left, right = [], []
+    for b in text_blocks:
+        cx = (b[0] + b[2]) / 2
+        (left if cx < mid else right).append(b)
+
+    left.sort(key=lambda b: (b[1], b[0]))
+    right.sort(key=lambda b: (b[1], b[0]))
+    return left + right
+
+
+def page_columns(xy: np.ndarray, spanning: np.ndarray, group: np.ndarray, page_width: float,
+                 gutter_frac: float = GUTTER_FRAC) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Column structure of one page, for all bands at once.
+
+    Within each group (region of the page), spanning boxes cut the region
+    into horizontal bands: a box belongs to the band after the last spanning
+    box of its group starting at or above it. In each band the x-coverage
+    of the other boxes is histogrammed at 1pt (weighted by box height);
+    runs of at least MIN_GUTTER pt inside the band's extent where coverage
+    is at most gutter_frac of the band's peak are gutters (gutter_frac = 0:
+    only gaps no box covers).
+
+    Returns per box: band (ordered by group, then top to bottom), column key
+    (columns left to right, sidebar columns after them, 0 for spanning
+    boxes) and whether the box straddles a gutter of its band.
+    """
+    x0, y0, x1, y1 = xy.T
+    y = y0 - y0.min()
+    key = group * (y.max() + 1) + y
+    band = np.searchsorted(np.sort(key[spanning]), key, side="right") + group
+    bins = int(np.ceil(page_width)) + 2
+
+    # histogram rows only for bands holding non-spanning boxes
+    body = ~spanning
+    rows, b = np.unique(band[body], return_inverse=True)
+    row = np.minimum(np.searchsorted(rows, band), max(len(rows) - 1, 0))
+    n_bands = max(len(rows), 1)
+    s = np.clip(np.floor(x0[body]), 0, bins - 1).astype(np.int64)
+    e = np.clip(np.ceil(x1[body]), 0, bins - 1).astype(np.int64)
+    w = np.maximum(y1 - y0, 1.0)[body]
+
+    size = n_bands * bins
+    diff = np.bincount(b * bins + s, w, size) - np.bincount(b * bins + e, w, size)
+    cov = diff.reshape(n_bands, bins).cumsum(axis=1)
+
+    lo = np.full(n_bands, bins)
+    hi = np.zeros(n_bands, dtype=np.int64)
+    np.minimum.at(lo, b, s)
+    np.maximum.at(hi, b, e)
+    xs = np.arange(bins)
+    inside = (xs >= lo[:, None]) & (xs < hi[:, None])
+    low = inside & (cov <= gutter_frac * cov.max(axis=1, keepdims=True) + 1e-9)
+
+    # gutter runs: +1 / -1 steps of the low mask (row-major, so starts and ends pair up)
+    pad = np.zeros((n_bands, 1), dtype=np.int8)
+    steps = np.diff(np.hstack([pad, low.astype(np.int8), pad]), axis=1)
+    run_band, run_start = np.nonzero(steps == 1)
+    _, run_end = np.nonzero(steps == -1)
+    keep = run_end - run_start >= MIN_GUTTER
+    gutters = run_band[keep] * bins + (run_start[keep] + run_end[keep]) / 2
+
+    base = row * bins
+    first = np.searchsorted(gutters, base)
+    col = np.searchsorted(gutters, base + (x0 + x1) / 2) - first
+    crossing = body & (np.searchsorted(gutters, base + x1 - GUTTER_TOL)
+                       > np.searchsorted(gutters, base + x0 + GUTTER_TOL))
+    col[spanning] = 0
+
+    # sidebars: columns holding less than SIDEBAR_SHARE of their band's text
+    n_cols = int(col.max()) + 1
+    mass = np.maximum(y1 - y0, 1.0) * np.maximum(x1 - x0, 1.0) * body
+    col_mass = np.bincount(row * n_cols + col, mass, n_bands * n_cols)
+    band_mass = np.bincount(row, mass, n_bands)
+    multi = np.searchsorted(gutters, base + bins) > first
+    sidebar = body & multi & (col_mass[row * n_cols + col] < SIDEBAR_SHARE * band_mass[row])
+    return band, col + sidebar * n_cols, crossing
+
+
+def page_layout(xy: np.ndarray, page_width: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (band, column key, spanning) for the boxes xy = [[x0, y0, x1, y1], ...]
+    (top-left origin); see reading_order.
+    """
+    n = len(xy)
+    x0, _, x1, _ = xy.T
+    zeros = np.zeros(n, dtype=np.int64)
+    _, region, _ = page_columns(xy, np.zeros(n, dtype=bool), zeros, page_width, gutter_frac=0.0)
+
+    n_regions = int(region.max()) + 1
+    left = np.full(n_regions, np.inf)
+    right = np.full(n_regions, -np.inf)
+    np.minimum.at(left, region, x0)
+    np.maximum.at(right, region, x1)
+    spanning = (x1 - x0) >= WIDE_RATIO * (right - left)[region]
+
+    band, col, crossing = page_columns(xy, spanning, region, page_width)
+    if crossing.any():
+        spanning |= crossing
+        band, col, _ = page_columns(xy, spanning, region, page_width)
+    return band, col, spanning
+
+
+def reading_order(xy: np.ndarray, page_width: float) -> np.ndarray:
+    """
+    Reading order of the boxes xy = [[x0, y0, x1, y1], ...] (top-left origin).
+
+    First the page is split at gutters that no box crosses (e.g. a margin
+    sidebar, or columns without spanning headings); small regions are
+    sidebars and are read last. In each region, boxes at least WIDE_RATIO
+    of the region's text width span all columns (headings, full-width
+    paragraphs), and so do boxes straddling a gutter found without them.
+    They cut the region into bands; in a band, columns are read left to
+    right (sidebars last), each top to bottom, and a spanning box is read
+    before the band below it.
+    """
+    if len(xy) < 2:
+        return np.arange(len(xy))
+    band, col, spanning = page_layout(xy, page_width)
+    return np.lexsort((xy[:, 0], xy[:, 1], col, ~spanning, band))
+
+
+def blocks_to_lines(blocks: List[Tuple], page_width: float) -> List[str]:
+    """
+    Convert blocks to ordered lines (reading_order, or midline_order with
+    LAYOUT = "midline").
+    """
     text_blocks = [
         b for b in blocks
         if len(b) >= 5 and isinstance(b[4], str) and b[4].strip()
     ]
 
-    col_count = detect_columns(text_blocks, page_width)
-
-    if col_count == 1:
-        ordered = sorted(text_blocks, key=lambda b: (b[1], b[0]))  # (y0, x0)
+    if LAYOUT == "midline":
+        ordered = midline_order(text_blocks, page_width)
     else:
-        mid = page_width / 2
-        left, right = [], []
-        for b in text_blocks:
-            cx = (b[0] + b[2]) / 2
-            (left if cx < mid else right).append(b)
-
-        left.sort(key=lambda b: (b[1], b[0]))
-        right.sort(key=lambda b: (b[1], b[0]))
-        ordered = left + right
+        xy = np.array([b[:4] for b in text_blocks], dtype=np.float64).reshape(-1, 4)
+        ordered = [text_blocks[i] for i in reading_order(xy, page_width)]
 
     lines: List[str] = []
     for b in ordered:
@@ -205,22 +359,145 @@ def blocks_to_lines(blocks: List[Tuple], page_width: float) -> List[str]:
     return lines
 
 
-def extract_pdf_to_text(pdf_path: Path) -> str:
+# -------------------------
+# Repeated header/footer lines
+# -------------------------
+DIGITS_PAT = re.compile(r"[0-9０-９]+")
+SPACES_PAT = re.compile(r"\s+")
+
+
+def edge_key(line: str) -> int:
+    """
+    Hash of a line with digits collapsed and whitespace removed, so
+    "第１部 …  12" and "第１部 … 13" share a key.
+    """
+    return hash(SPACES_PAT.sub("", DIGITS_PAT.sub("0", line)))
+
+
+def edge_indices(n_lines: int, k: int = EDGE_LINES) -> List[int]:
+    top = range(min(k, n_lines))
+    bottom = range(max(k, n_lines - k), n_lines)
+    return list(top) + list(bottom)
+
+
+def edge_keys(lines: List[str], start: int) -> List[Tuple[int, int]]:
+    """
+    (output position, edge_key) of a page's top/bottom lines, for a page
+    whose lines start at position `start` of the output.
+    """
+    return [(start + i, edge_key(lines[i])) for i in edge_indices(len(lines))]
+
+
+def repeated_edges(edges: List[List[Tuple[int, int]]]) -> Set[int]:
+    """
+    Output positions of the edge lines to drop, given the edge_keys of every
+    page of one PDF: lines whose key recurs on enough pages. The threshold
+    depends on the page count, so this runs once all pages are seen; only
+    these hashes (O(pages)) are kept meanwhile, not the pages' lines.
+    """
+    counts: Dict[int, int] = {}
+    for keys in edges:
+        for h in {h for _, h in keys}:
+            counts[h] = counts.get(h, 0) + 1
+
+    min_pages = max(REPEAT_MIN_PAGES, REPEAT_MIN_RATIO * len(edges))
+    return {pos for keys in edges for pos, h in keys if counts[h] >= min_pages}
+
+
+# -------------------------
+# Extraction backends
+# -------------------------
+# Each backend yields the ordered lines of every page of one PDF. All of
+# them reduce a page to (x0, y0, x1, y1, text) boxes in top-left origin
+# coordinates and share blocks_to_lines for column handling, so they
+# differ only in how text is segmented and read from the PDF.
+def pymupdf_blocks_pages(pdf_path: Path) -> Iterator[List[str]]:
+    """
+    PyMuPDF text blocks (paragraph-level boxes).
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            yield blocks_to_lines(page.get_text("blocks"), page.rect.width)
+
+
+def pymupdf_words_pages(pdf_path: Path) -> Iterator[List[str]]:
+    """
+    PyMuPDF words regrouped into their text lines (line-level boxes).
+    Finer boxes than "blocks", so a block spanning both columns is split
+    by the column ordering instead of being read as one piece.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            lines: Dict[Tuple[int, int], List[Tuple]] = {}
+            for w in page.get_text("words"):
+                lines.setdefault((w[5], w[6]), []).append(w)
+            boxes = [
+                (min(w[0] for w in ws), min(w[1] for w in ws),
+                 max(w[2] for w in ws), max(w[3] for w in ws),
+                 " ".join(w[4] for w in ws))
+                for ws in lines.values()
+            ]
+            yield blocks_to_lines(boxes, page.rect.width)
+
+
+def pdfminer_pages(pdf_path: Path) -> Iterator[List[str]]:
+    """
+    pdfminer.six layout analysis (text boxes from LAParams grouping).
+    """
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    for page in extract_pages(str(pdf_path)):
+        boxes = [
+            (el.x0, page.height - el.y1, el.x1, page.height - el.y0, el.get_text())
+            for el in page if isinstance(el, LTTextContainer)
+        ]
+        yield blocks_to_lines(boxes, page.width)
+
+
+BACKENDS: Dict[str, Callable[[Path], Iterator[List[str]]]] = {
+    "blocks": pymupdf_blocks_pages,
+    "words": pymupdf_words_pages,
+    "pdfminer": pdfminer_pages,
+}
+
+
+def extract_pdf_to_text(pdf_path: Path, backend: str = "") -> str:
     """
     Extract a single PDF into text with page breaks.
     """
-    doc = fitz.open(pdf_path)
-    out_lines: List[str] = []
-    for page_idx, page in enumerate(doc, start=1):
-        blocks = page.get_text("blocks")
-        lines = blocks_to_lines(blocks, page.rect.width)
+    backend = backend or BACKEND
+    if backend not in BACKENDS:
+        raise SystemExit(f"Unknown backend: {backend} (choose from {', '.join(BACKENDS)})")
 
+    # pages stream straight into the output; with STRIP_REPEATED_EDGES only
+    # their edge-line hashes are kept, and repeated ones are dropped at the end
+    out_lines: List[str] = []
+    edges: List[List[Tuple[int, int]]] = []
+    for page_idx, lines in enumerate(BACKENDS[backend](pdf_path), start=1):
         out_lines.append(f"## PAGE {page_idx} ##")
+        if STRIP_REPEATED_EDGES:
+            edges.append(edge_keys(lines, len(out_lines)))
         out_lines.extend(lines)
         out_lines.append("")  # page separator
+
+    drop = repeated_edges(edges) if edges else set()
+    if drop:
+        out_lines = [ln for i, ln in enumerate(out_lines) if i not in drop]
     return "\n".join(out_lines).strip() + "\n"
 
 
+PAGE_MARKER_PAT = re.compile(r"^## PAGE \d+ ##$", re.M)
+
+
+def count_pages(text: str) -> int:
+    return len(PAGE_MARKER_PAT.findall(text))
+
+
 # -------------------------
 # Optional cleaning (light)
 # -------------------------
@@ -285,9 +562,11 @@ def clean_text(text: str) -> str:
 # -------------------------
 # Main: process all PDFs and write year corpora
 # -------------------------
-def main() -> None:
+def extract_main() -> None:
+    """
+    corpus/pdf/**.pdf -> txt_raw/YYYY.txt
+    """
     OUT_RAW.mkdir(parents=True, exist_ok=True)
-    OUT_CLEAN.mkdir(parents=True, exist_ok=True)
 
     pdfs = sorted(PDF_ROOT.rglob("*.pdf"))
     if not pdfs:
@@ -299,30 +578,89 @@ def main() -> None:
         y = year_from_path(pdf)
         by_year.setdefault(y, []).append(pdf)
 
+    report = RunReport("extract")
+    recorder = Recorder("raw", report.started) if RECORD_PAGES else None
     for y, year_pdfs in sorted(by_year.items()):
         print(f"\n=== YEAR {y} ({len(year_pdfs)} PDFs) ===")
         parts: List[str] = []
 
-        for pdf in sorted(year_pdfs):
-            print("extracting:", pdf)
-            parts.append(f"### SOURCE: {pdf.name} ###\n")
-            parts.append(extract_pdf_to_text(pdf))
-            parts.append("\n")
-            if SLEEP_BETWEEN_PDFS:
-                time.sleep(SLEEP_BETWEEN_PDFS)
-
-        raw_text = "".join(parts)
-        raw_out = OUT_RAW / f"{y}.txt"
-        raw_out.write_text(raw_text, encoding="utf-8")
+        with report.stage("extract", y) as st:
+            for pdf in sorted(year_pdfs):
+                print("extracting:", pdf)
+                text = extract_pdf_to_text(pdf)
+                parts.append(f"### SOURCE: {pdf.name} ###\n")
+                parts.append(text)
+                parts.append("\n")
+                st.add(pdfs=1, pages=count_pages(text), bytes_in=pdf.stat().st_size)
+                if SLEEP_BETWEEN_PDFS:
+                    time.sleep(SLEEP_BETWEEN_PDFS)
+
+            raw_text = "".join(parts)
+            raw_out = OUT_RAW / f"{y}.txt"
+            raw_out.write_text(raw_text, encoding="utf-8")
+            st.add(bytes=len(raw_text.encode("utf-8")))
         print("wrote:", raw_out)
 
-        cleaned = clean_text(raw_text)
-        clean_out = OUT_CLEAN / f"{y}.clean.txt"
-        clean_out.write_text(cleaned, encoding="utf-8")
+        if recorder is not None:
+            recorder.add(y, raw_text)
+
+    if recorder is not None:
+        print("pages recorded:", recorder.dir)
+
+    report.save()
+
+
+def clean_main() -> None:
+    """
+    txt_raw/YYYY.txt -> txt_clean/YYYY.clean.txt
+    """
+    OUT_CLEAN.mkdir(parents=True, exist_ok=True)
+
+    raws = sorted(OUT_RAW.glob("*.txt"))
+    if not raws:
+        raise SystemExit(f"No raw texts found under: {OUT_RAW.resolve()}")
+
+    tokenizer = None
+    if WRITE_PARQUET:
+        import paragraphs
+
+        paragraphs.require_pyarrow()
+        tokenizer = paragraphs.make_tokenizer()
+
+    report = RunReport("clean")
+    recorder = Recorder("clean", report.started) if RECORD_PAGES else None
+    for raw_path in raws:
+        with report.stage("clean", raw_path.stem) as st:
+            raw_text = raw_path.read_text(encoding="utf-8")
+            cleaned = clean_text(raw_text)
+            clean_out = OUT_CLEAN / f"{raw_path.stem}.clean.txt"
+            clean_out.write_text(cleaned, encoding="utf-8")
+            st.add(
+                bytes=len(raw_text.encode("utf-8")),
+                lines_in=raw_text.count("\n"),
+                lines_out=cleaned.count("\n"),
+            )
         print("wrote:", clean_out)
 
+        if recorder is not None:
+            recorder.add(raw_path.stem, cleaned)
+
+        if WRITE_PARQUET:
+            with report.stage("parquet", raw_path.stem) as st:
+                n = paragraphs.write_year("clean", raw_path.stem, cleaned, tokenizer)
+                st.add(paragraphs=n)
+            print("wrote:", paragraphs.DATASET_DIR / "clean" / f"year={raw_path.stem}")
+
+    if recorder is not None:
+        print("pages recorded:", recorder.dir)
+    report.save()
+
+
+def main() -> None:
+    extract_main()
+    clean_main()
     print("\nDone.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,180 @@
+"""
+Single entry point for the pipeline stages
+
+  python -m pipeline extract     corpus/pdf -> txt_raw          (pdftotxt.py)
+  python -m pipeline clean       txt_raw -> txt_clean           (pdftotxt.py)
+  python -m pipeline norm        txt_clean -> txt_clean_norm    (norm.py)
+  python -m pipeline dedup       txt_clean_norm -> txt_dedup     (dedup.py)
+  python -m pipeline tokenise    txt_clean -> tokens            (tokenise.py)
+  python -m pipeline colloc      stats -> stats/collocations.tsv (collocations.py)
+  python -m pipeline train       tokens -> models               (train_word2vec_yearly.py)
+  python -m pipeline neighbors   models -> stdout               (print_neighbors.py)
+  python -m pipeline bootstrap   tokens -> bootstrap/report.tsv (bootstrap.py)
+  python -m pipeline serve       models -> vectors -> HTTP      (query_server.py)
+  python -m pipeline cluster     vectors -> clusters            (clusters.py)
+  python -m pipeline plot        models -> plots                (plot_semantic_space.py)
+
+Options override the stage module's config constants for this run. This
+module imports only argparse/importlib; each stage module is imported when
+its subcommand runs, and the stage modules import fitz, sudachipy, gensim,
+scikit-learn and umap inside the functions that use them, so `--help` and
+argument errors return immediately.
+
+Stages write a JSON run report under reports/ (see instrument.py);
+`python -m pipeline --profile <stage>` also saves cProfile stats there.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class Opt(NamedTuple):
+    flag: str
+    config: str                     # module-level constant to override
+    type: Optional[Callable] = str
+    help: str = ""
+    action: Optional[str] = None
+    choices: Optional[Tuple[str, ...]] = None
+
+
+class Stage(NamedTuple):
+    module: str
+    func: str
+    help: str
+    opts: Tuple[Opt, ...]
+
+
+STAGES: Dict[str, Stage] = {
+    "extract": Stage("pdftotxt", "extract_main", "extract PDFs to year-level raw text", (
+        Opt("--pdf-root", "PDF_ROOT", Path),
+        Opt("--out", "OUT_RAW", Path),
+        Opt("--backend", "BACKEND", str, choices=("blocks", "words", "pdfminer")),
+        Opt("--layout", "LAYOUT", str, choices=("columns", "midline")),
+        Opt("--no-record", "RECORD_PAGES", None, "do not record page hashes under runs/", "store_false"),
+    )),
+    "clean": Stage("pdftotxt", "clean_main", "drop table/caption-ish lines from raw text", (
+        Opt("--in", "OUT_RAW", Path),
+        Opt("--out", "OUT_CLEAN", Path),
+        Opt("--parquet", "WRITE_PARQUET", None, "also write dataset/clean/ (needs pyarrow)", "store_true"),
+        Opt("--no-record", "RECORD_PAGES", None, "do not record page hashes under runs/", "store_false"),
+    )),
+    "norm": Stage("norm", "main", "join lines broken mid-sentence", (
+        Opt("--in", "IN_DIR", Path),
+        Opt("--out", "OUT_DIR", Path),
+        Opt("--parquet", "WRITE_PARQUET", None, "also write dataset/norm/ (needs pyarrow)", "store_true"),
+        Opt("--no-record", "RECORD_PAGES", None, "do not record page hashes under runs/", "store_false"),
+    )),
+    "dedup": Stage("dedup", "main", "drop near-duplicate paragraphs within/across years", (
+        Opt("--in", "IN_DIR", Path),
+        Opt("--out", "OUT_DIR", Path),
+        Opt("--threshold", "THRESHOLD", float, "estimated Jaccard similarity"),
+        Opt("--flag-only", "FLAG_ONLY", None, "write duplicates.tsv only", "store_true"),
+    )),
+    "tokenise": Stage("tokenise", "main", "Sudachi tokenisation to tokens/", (
+        Opt("--in", "IN_DIR", Path),
+        Opt("--out", "OUT_DIR", Path),
+        Opt("--split-mode", "SPLIT_MODE", str, "A/B/C"),
+        Opt("--no-compounds", "USE_COMPOUNDS", None, "disable compound merging", "store_false"),
+        Opt("--no-sentences", "WRITE_SENTENCES", None, "skip the LineSentence files", "store_false"),
+    )),
+    "colloc": Stage("collocations", "main", "per-year collocates of target words (PMI / LL / t)", (
+        Opt("--targets", "TARGETS", lambda s: s.split(","), "comma-separated target words"),
+        Opt("--window", "WINDOW", int),
+        Opt("--min-count", "MIN_PAIR_COUNT", int),
+        Opt("--measure", "MEASURE", str, choices=("ll", "pmi", "t")),
+        Opt("--top", "TOP", int),
+    )),
+    "train": Stage("train_word2vec_yearly", "main", "train one Word2Vec model per year", (
+        Opt("--tokens", "TOKEN_DIR", Path),
+        Opt("--models", "MODEL_DIR", Path),
+        Opt("--vector-size", "VECTOR_SIZE", int),
+        Opt("--window", "WINDOW", int),
+        Opt("--min-count", "MIN_COUNT", int),
+        Opt("--epochs", "EPOCHS", int),
+        Opt("--workers", "WORKERS", int),
+        Opt("--iterable", "CORPUS_FILE", None, "train from a Python iterable instead of corpus_file", "store_false"),
+        Opt("--mode", "MODE", str, choices=("yearly", "window", "joint")),
+        Opt("--window-years", "WINDOW_YEARS", int, "years per model in window mode"),
+        Opt("--window-step", "WINDOW_STEP", int),
+        Opt("--targets", "TARGETS", lambda s: s.split(","), "comma-separated words tagged by year in joint mode"),
+    )),
+    "neighbors": Stage("print_neighbors", "main", "print nearest neighbours of the target per year", (
+        Opt("--models", "MODEL_DIR", Path),
+        Opt("--glob", "MODEL_GLOB", str, 'model files to read, e.g. "window_*.model"'),
+        Opt("--target", "TARGET", str),
+        Opt("--topn", "TOPN", int),
+    )),
+    "bootstrap": Stage("bootstrap", "main", "bootstrap CIs for target similarities and neighbour ranks", (
+        Opt("--targets", "TARGETS", lambda s: s.split(","), "comma-separated target words"),
+        Opt("--years", "YEARS", lambda s: s.split(","), "comma-separated years (default: all)"),
+        Opt("--replicates", "REPLICATES", int, "total replicates; cached ones are reused"),
+        Opt("--unit", "UNIT", str, choices=("line", "paragraph", "page", "document")),
+        Opt("--method", "METHOD", str, choices=("ppmi", "w2v")),
+        Opt("--workers", "WORKERS", int),
+        Opt("--topn", "TOPN", int),
+    )),
+    "serve": Stage("query_server", "main", "HTTP/JSON neighbour/similarity/analogy queries over vectors/", (
+        Opt("--host", "HOST", str),
+        Opt("--port", "PORT", int),
+        Opt("--cache-size", "CACHE_SIZE", int, "LRU entries per query type"),
+        Opt("--no-export", "EXPORT", None, "serve vectors/ as is", "store_false"),
+        Opt("--dtype", "DTYPE", str, choices=("float32", "float16", "int8")),
+    )),
+    "cluster": Stage("clusters", "main", "per-year kNN graphs and concept clusters over vectors/", (
+        Opt("--k", "K", int, "neighbours per word in the kNN graph"),
+        Opt("--clusters", "N_CLUSTERS", int),
+        Opt("--method", "METHOD", str, choices=("graph", "kmeans")),
+        Opt("--block-mb", "BLOCK_MB", int, "memory for one block of scores"),
+        Opt("--dtype", "DTYPE", str, choices=("float32", "float16", "int8")),
+        Opt("--targets", "TARGETS", lambda s: s.split(","), "comma-separated words for the drift report"),
+        Opt("--no-export", "EXPORT", None, "use vectors/ as is", "store_false"),
+    )),
+    "plot": Stage("plot_semantic_space", "main", "PCA/UMAP maps of the target's neighbours", (
+        Opt("--models", "MODEL_DIR", Path),
+        Opt("--target", "TARGET", str),
+        Opt("--topn", "TOPN", int),
+        Opt("--workers", "WORKERS", int),
+        Opt("--joint", "JOINT", None, "fit one projection over aligned years", "store_true"),
+        Opt("--no-clusters", "CLUSTERS", None, "do not colour points by cluster", "store_false"),
+    )),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m pipeline", description="Whitepaper corpus pipeline")
+    ap.add_argument("--profile", action="store_true", help="run each stage under cProfile (saved under reports/)")
+    sub = ap.add_subparsers(dest="stage", required=True)
+    for name, stage in STAGES.items():
+        sp = sub.add_parser(name, help=stage.help, description=stage.help)
+        for opt in stage.opts:
+            kw = {"dest": opt.config, "default": None, "help": opt.help or f"overrides {opt.config}"}
+            if opt.action:
+                sp.add_argument(opt.flag, action=opt.action, **kw)
+            else:
+                sp.add_argument(opt.flag, type=opt.type, choices=opt.choices, **kw)
+    return ap
+
+
+def run(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    stage = STAGES[args.stage]
+
+    if args.profile:
+        import instrument
+
+        instrument.PROFILE = True
+
+    module = importlib.import_module(stage.module)
+    for opt in stage.opts:
+        value = getattr(args, opt.config)
+        if value is not None:
+            setattr(module, opt.config, value)
+    getattr(module, stage.func)()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,71 +1,269 @@
+"""
+PCA / UMAP maps of the target word and its nearest neighbours per year
+
+Input:
+  ./models/[year].model
+Output:
+  ./plots/pca_[year].png, ./plots/umap_[year].png
+  ./plots/joint_pca_[year].png, ... (with JOINT = True)
+  ./plots/cache/*.npz   cached neighbour lists and 2-D coordinates
+
+With CLUSTERS = True, points are coloured by their concept cluster when
+clusters.py has built a cluster map for the year (clusters/).
+
+Each year's neighbour list is computed once, and each projection is cached
+on disk under a key made of (year, model file, word set, method), so reruns
+only redraw figures. Years are rendered in a process pool.
+
+With JOINT = True, every year's vectors are rotated onto the last year's
+space (orthogonal Procrustes over the shared vocabulary), one projection is
+fitted over all years' points together, and all maps share the same axes so
+positions are comparable across years.
+
+Run:
+  python plot_semantic_space.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from gensim.models import Word2Vec
-import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
-import umap
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
 
+# -------------------------
+# Config
+# -------------------------
 MODEL_DIR = Path("models")
+PLOT_DIR = Path("plots")
+CACHE_DIR = PLOT_DIR / "cache"
 TARGET = "科学"
 TOPN = 20
 
+METHODS = ("pca", "umap")
+JOINT = False
+CLUSTERS = True
+WORKERS = min(4, os.cpu_count() or 1)
 
-def plot_year(year, model):
-    words = [TARGET]
-    sims = model.wv.most_similar(TARGET, topn=TOPN)
-    words += [w for w, _ in sims]
+# UMAP is stochastic; fix the seed so cached and fresh coordinates agree
+RANDOM_STATE = 42
 
-    vecs = [model.wv[w] for w in words]
 
-    # PCA
-    pca = PCA(n_components=2)
-    coords = pca.fit_transform(vecs)
+# -------------------------
+# Model access / caching
+# -------------------------
+def model_key(path: Path) -> str:
+    st = path.stat()
+    return f"{path.name}:{st.st_size}:{st.st_mtime_ns}"
 
-    plt.figure(figsize=(6,6))
-    for i, w in enumerate(words):
-        x, y = coords[i]
-        plt.scatter(x, y)
-        plt.text(x, y, w)
 
-    plt.title(f"PCA {year}")
-    plt.tight_layout()
-    plt.savefig(f"plots/pca_{year}.png")
-    plt.close()
+def cache_path(kind: str, *parts: str) -> Path:
+    h = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{kind}_{h}.npz"
+
+
+def load_wv(path: Path):
+    from gensim.models import Word2Vec
+
+    return Word2Vec.load(str(path), mmap="r").wv
+
+
+def neighbour_words(path: Path, target: str, topn: int, get_wv=None) -> Optional[List[str]]:
+    """
+    target followed by its topn neighbours (cached per model file).
+    Returns None if target is out of vocabulary. get_wv() returns the
+    model's vectors if the caller has (or will need) them loaded.
+    """
+    cp = cache_path("nbr", model_key(path), target, str(topn))
+    if cp.exists():
+        words = [str(w) for w in np.load(cp)["words"]]
+        return words or None
+
+    wv = get_wv() if get_wv is not None else load_wv(path)
+    words: List[str] = []
+    if target in wv:
+        words = [target] + [w for w, _ in wv.most_similar(target, topn=topn)]
+    np.savez(cp, words=np.array(words))
+    return words or None
+
+
+# -------------------------
+# Projection
+# -------------------------
+def fit_projection(vecs: np.ndarray, method: str) -> np.ndarray:
+    if method == "pca":
+        from sklearn.decomposition import PCA
+
+        return PCA(n_components=2).fit_transform(vecs)
+    if method == "umap":
+        import umap
 
+        n_neighbors = min(15, len(vecs) - 1)
+        return umap.UMAP(n_neighbors=n_neighbors, random_state=RANDOM_STATE).fit_transform(vecs)
+    raise ValueError(f"unknown method: {method}")
 
-def plot_umap_year(year, model):
-    words = [TARGET]
-    sims = model.wv.most_similar(TARGET, topn=TOPN)
-    words += [w for w, _ in sims]
 
-    vecs = [model.wv[w] for w in words]
+def cached_projection(key: Tuple[str, ...], vecs_fn, method: str) -> np.ndarray:
+    cp = cache_path(method, *key)
+    if cp.exists():
+        return np.load(cp)["coords"]
+    coords = fit_projection(vecs_fn(), method)
+    np.savez(cp, coords=coords)
+    return coords
 
-    reducer = umap.UMAP()
-    coords = reducer.fit_transform(vecs)
 
-    plt.figure(figsize=(6,6))
+# -------------------------
+# Plotting
+# -------------------------
+def word_clusters(year: str, words: List[str], enabled: bool) -> Optional[np.ndarray]:
+    """
+    Cluster id of each word from clusters.py's map of that year, or None.
+    """
+    if not enabled:
+        return None
+    from clusters import cluster_labels
+
+    return cluster_labels(year, words)
+
+
+def draw(words: List[str], coords: np.ndarray, title: str, out: Path, lims=None,
+         labels: Optional[np.ndarray] = None) -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    cmap = plt.get_cmap("tab20")
+    plt.figure(figsize=(6, 6))
     for i, w in enumerate(words):
         x, y = coords[i]
-        plt.scatter(x, y)
-        plt.text(x, y, w)
+        if labels is None:
+            plt.scatter(x, y)
+            plt.text(x, y, w)
+        else:
+            color = cmap(labels[i] % 20) if labels[i] >= 0 else "lightgray"
+            plt.scatter(x, y, color=color)
+            plt.text(x, y, f"{w} [{labels[i]}]", color=color)
 
-    plt.title(f"UMAP {year}")
+    if lims is not None:
+        plt.xlim(*lims[0])
+        plt.ylim(*lims[1])
+    plt.title(title)
     plt.tight_layout()
-    plt.savefig(f"plots/umap_{year}.png")
+    plt.savefig(out)
     plt.close()
 
 
-Path("plots").mkdir(exist_ok=True)
+def plot_year(path: Path, target: str, topn: int, clusters: bool) -> str:
+    """
+    Worker: neighbours + per-year projections for one model file. Settings
+    are passed in, since spawned workers do not see overridden globals.
+    """
+    year = path.stem
+    wv = None
+
+    def get_wv():
+        nonlocal wv
+        if wv is None:
+            wv = load_wv(path)
+        return wv
+
+    words = neighbour_words(path, target, topn, get_wv)
+    if words is None:
+        return f"{year}: {target} not in vocabulary"
+
+    def vecs() -> np.ndarray:
+        return np.stack([get_wv()[w] for w in words])
+
+    labels = word_clusters(year, words, clusters)
+    for method in METHODS:
+        coords = cached_projection((model_key(path), *words), vecs, method)
+        draw(words, coords, f"{method.upper()} {year}", PLOT_DIR / f"{method}_{year}.png", labels=labels)
+    return f"{year}: plotted"
+
+
+# -------------------------
+# Joint projection
+# -------------------------
+def procrustes_rotation(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    Orthogonal R minimising ||src R - dst|| (rows are paired words).
+    """
+    u, _, vt = np.linalg.svd(src.T @ dst)
+    return u @ vt
+
+
+def unit(m: np.ndarray) -> np.ndarray:
+    return m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+
+def joint_plots(files: List[Path], pool: ProcessPoolExecutor) -> None:
+    words_by_year: Dict[str, List[str]] = {}
+    for f in files:
+        words = neighbour_words(f, TARGET, TOPN)
+        if words is not None:
+            words_by_year[f.stem] = words
+    if not words_by_year:
+        return
+
+    used = [f for f in files if f.stem in words_by_year]
+    key = tuple(model_key(f) for f in used) + tuple(w for y in sorted(words_by_year) for w in words_by_year[y])
+
+    def vecs() -> np.ndarray:
+        wvs = {f.stem: load_wv(f) for f in used}
+        ref = wvs[used[-1].stem]
+        blocks = []
+        for f in used:
+            wv = wvs[f.stem]
+            shared = [w for w in wv.index_to_key if w in ref.key_to_index]
+            rot = procrustes_rotation(unit(wv[shared]), unit(ref[shared]))
+            blocks.append(unit(wv[words_by_year[f.stem]]) @ rot)
+        return np.concatenate(blocks)
+
+    for method in METHODS:
+        coords = cached_projection(("joint",) + key, vecs, method)
+        pad = 0.05 * (coords.max(axis=0) - coords.min(axis=0))
+        lo, hi = coords.min(axis=0) - pad, coords.max(axis=0) + pad
+        lims = ((lo[0], hi[0]), (lo[1], hi[1]))
+
+        jobs = []
+        start = 0
+        for f in used:
+            words = words_by_year[f.stem]
+            part = coords[start:start + len(words)]
+            start += len(words)
+            out = PLOT_DIR / f"joint_{method}_{f.stem}.png"
+            jobs.append(pool.submit(draw, words, part, f"joint {method.upper()} {f.stem}", out, lims,
+                                    word_clusters(f.stem, words, CLUSTERS)))
+        for j in jobs:
+            j.result()
+        print(f"joint {method}: plotted {len(jobs)} years")
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    PLOT_DIR.mkdir(exist_ok=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-for file in sorted(MODEL_DIR.glob("20*.model")):
-    year = file.stem
-    print("plotting", year)
+    files = sorted(MODEL_DIR.glob("20*.model"))
+    if not files:
+        raise SystemExit(f"No models found in {MODEL_DIR.resolve()}")
 
-    model = Word2Vec.load(file)
+    with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+        n = len(files)
+        for msg in pool.map(plot_year, files, [TARGET] * n, [TOPN] * n, [CLUSTERS] * n):
+            print(msg)
+        if JOINT:
+            joint_plots(files, pool)
 
-    if TARGET not in model.wv:
-        continue
+    print("done")
 
-    plot_year(year, model)
-    plot_umap_year(year, model)
 
-print("done")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
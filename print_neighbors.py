@@ -1,22 +1,29 @@
 from pathlib import Path
-from gensim.models import Word2Vec
 
 MODEL_DIR = Path("models")
+MODEL_GLOB = "20*.model"
 TARGET = "科学"
 TOPN = 15
 
 
-for file in sorted(MODEL_DIR.glob("20*.model")):
-    year = file.stem
-    model = Word2Vec.load(str(file))
+def main():
+    from gensim.models import Word2Vec
 
-    print("\n====================")
-    print(year)
-    print("====================")
+    for file in sorted(MODEL_DIR.glob(MODEL_GLOB)):
+        year = file.stem
+        model = Word2Vec.load(str(file))
 
-    if TARGET not in model.wv:
-        print("not found")
-        continue
+        print("\n====================")
+        print(year)
+        print("====================")
 
-    for word, sim in model.wv.most_similar(TARGET, topn=TOPN):
-        print(f"{word:15s} {sim:.3f}")
\ No newline at end of file
+        if TARGET not in model.wv:
+            print("not found")
+            continue
+
+        for word, sim in model.wv.most_similar(TARGET, topn=TOPN):
+            print(f"{word:15s} {sim:.3f}")
+
+
+if __name__ == "__main__":
+    main()
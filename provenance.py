@@ -0,0 +1,184 @@
+"""
+Token -> source PDF / page provenance for tokenised year files
+
+tokenise.py strips the `### SOURCE: ... ###` and `## PAGE n ##` marker
+lines from the token stream and records where they were in a sidecar:
+
+  ./tokens/[year].prov.json
+    {"n_tokens": N,
+     "sources":  ["Document 1386489 (1).pdf", ...],
+     "offsets":  [0, 812, 1604, ...],   # token position where each page starts
+     "source":   [0, 0, 0, ...],        # index into "sources"
+     "page":     [1, 2, 3, ...]}
+
+Positions count whitespace-separated tokens, i.e. indexes into
+`path.read_text().split()` (the same positions used by corpus_stats.py and
+concordance.py). Any position resolves to (source, page) by binary search
+over "offsets".
+
+Run:
+  python provenance.py 2019 12345 67890         # locate token positions
+  python provenance.py 2019 --source "Document 1417228 (3).pdf" --pages 10 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+
+# -------------------------
+# Config
+# -------------------------
+TOKEN_DIR = Path("tokens")
+
+
+def provenance_path(tokens_path: Path) -> Path:
+    return tokens_path.with_name(tokens_path.name.replace(".tokens.txt", ".prov.json"))
+
+
+# -------------------------
+# Writing
+# -------------------------
+class ProvenanceWriter:
+    """
+    Collects page boundaries while tokenising. Several markers at the same
+    token offset (SOURCE immediately followed by PAGE) collapse into one.
+    """
+
+    def __init__(self) -> None:
+        self.sources: List[str] = []
+        self.offsets: List[int] = []
+        self.source: List[int] = []
+        self.page: List[int] = []
+        self._src = -1
+        self._page = 0
+
+    def start_source(self, name: str, offset: int) -> None:
+        self.sources.append(name)
+        self._src = len(self.sources) - 1
+        self._page = 0
+        self._mark(offset)
+
+    def start_page(self, page: int, offset: int) -> None:
+        self._page = page
+        self._mark(offset)
+
+    def _mark(self, offset: int) -> None:
+        if self.offsets and self.offsets[-1] == offset:
+            self.source[-1] = self._src
+            self.page[-1] = self._page
+            return
+        self.offsets.append(offset)
+        self.source.append(self._src)
+        self.page.append(self._page)
+
+    def save(self, path: Path, n_tokens: int) -> None:
+        data = {
+            "n_tokens": n_tokens,
+            "sources": self.sources,
+            "offsets": self.offsets,
+            "source": self.source,
+            "page": self.page,
+        }
+        path.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+
+# -------------------------
+# Reading
+# -------------------------
+class Provenance:
+    def __init__(self, path: Path) -> None:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        self.n_tokens: int = data["n_tokens"]
+        self.sources: List[str] = data["sources"]
+        self.offsets: List[int] = data["offsets"]
+        self.source: List[int] = data["source"]
+        self.page: List[int] = data["page"]
+
+    @classmethod
+    def for_tokens(cls, tokens_path: Path) -> Optional["Provenance"]:
+        p = provenance_path(tokens_path)
+        return cls(p) if p.exists() else None
+
+    def locate(self, pos: int) -> Tuple[Optional[str], int]:
+        """
+        Return (source PDF name, page) of token position pos.
+        Tokens before the first marker return (None, 0).
+        """
+        i = bisect_right(self.offsets, pos) - 1
+        if i < 0 or self.source[i] < 0:
+            return None, 0
+        return self.sources[self.source[i]], self.page[i]
+
+    def spans(
+        self,
+        source: Optional[str] = None,
+        pages: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Yield merged [start, end) token ranges for a source PDF and/or an
+        inclusive page range.
+        """
+        cur: Optional[List[int]] = None
+        for i, start in enumerate(self.offsets):
+            end = self.offsets[i + 1] if i + 1 < len(self.offsets) else self.n_tokens
+            src = self.sources[self.source[i]] if self.source[i] >= 0 else None
+            ok = (source is None or src == source) and (
+                pages is None or pages[0] <= self.page[i] <= pages[1]
+            )
+            if not ok or start == end:
+                continue
+            if cur is not None and cur[1] == start:
+                cur[1] = end
+            else:
+                if cur is not None:
+                    yield cur[0], cur[1]
+                cur = [start, end]
+        if cur is not None:
+            yield cur[0], cur[1]
+
+
+def slice_tokens(tokens: List[str], spans: Iterator[Tuple[int, int]]) -> List[str]:
+    out: List[str] = []
+    for start, end in spans:
+        out.extend(tokens[start:end])
+    return out
+
+
+# -------------------------
+# Main
+# -------------------------
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Resolve token positions to PDF/page, or slice a sub-corpus")
+    ap.add_argument("year")
+    ap.add_argument("positions", nargs="*", type=int)
+    ap.add_argument("--source", help="PDF file name to slice")
+    ap.add_argument("--pages", nargs=2, type=int, metavar=("FIRST", "LAST"))
+    ap.add_argument("--out", type=Path, help="write the sliced tokens here")
+    args = ap.parse_args()
+
+    tokens_path = TOKEN_DIR / f"{args.year}.tokens.txt"
+    prov = Provenance.for_tokens(tokens_path)
+    if prov is None:
+        raise SystemExit(f"No provenance sidecar for {tokens_path} (re-run tokenise.py)")
+
+    for pos in args.positions:
+        src, page = prov.locate(pos)
+        print(f"{pos}\t{src}\tp.{page}")
+
+    if args.source or args.pages:
+        spans = list(prov.spans(args.source, tuple(args.pages) if args.pages else None))
+        n = sum(e - s for s, e in spans)
+        print(f"{len(spans)} spans, {n} tokens")
+        if args.out:
+            tokens = tokens_path.read_text(encoding="utf-8").split()
+            args.out.write_text(" ".join(slice_tokens(tokens, spans)), encoding="utf-8")
+            print("wrote", args.out)
+
+
+if __name__ == "__main__":
+    main()
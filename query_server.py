@@ -0,0 +1,148 @@
+"""
+Resident local HTTP/JSON query service over the per-year vectors
+
+Keeps every year of vectors/ open (memory-mapped, float32 or quantized;
+see vectors.py) and answers queries without reloading models:
+
+  GET /years
+  GET /neighbors?word=科学&topn=15[&year=2019]
+  GET /similarity?a=科学&b=技術[&year=2019]
+  GET /analogy?pos=科学,社会&neg=技術&topn=10[&year=2019]
+  GET /stats                                   cache hits/misses
+
+Without year a query runs over all years and the response maps year ->
+result (null where a word is out of vocabulary); topn outside
+1..MAX_TOPN is a 400. Per-year results are
+memoized in LRU caches keyed by (year, word, topn) (and the analogous
+keys for similarity/analogy), so repeated queries from notebooks or
+plotting scripts are dictionary lookups.
+
+Run:
+  python query_server.py                  # exports stale vectors, serves on 127.0.0.1:8765
+  curl 'http://127.0.0.1:8765/neighbors?word=科学&year=2019'
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import vectors
+from vectors import VectorStore
+
+
+# -------------------------
+# Config
+# -------------------------
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 4096
+TOPN = 15
+MAX_TOPN = 1000
+EXPORT = True
+DTYPE = vectors.DTYPE          # float32 / float16 / int8 (see vectors.py)
+
+
+# -------------------------
+# Queries
+# -------------------------
+class QueryService:
+    def __init__(self, store: VectorStore, cache_size: int = CACHE_SIZE) -> None:
+        self.store = store
+        self.neighbors = lru_cache(maxsize=cache_size)(self._neighbors)
+        self.similarity = lru_cache(maxsize=cache_size)(self._similarity)
+        self.analogy = lru_cache(maxsize=cache_size)(self._analogy)
+
+    def _neighbors(self, year: str, word: str, topn: int) -> Optional[List[Tuple[str, float]]]:
+        return self.store[year].neighbors(word, topn)
+
+    def _similarity(self, year: str, a: str, b: str) -> Optional[float]:
+        return self.store[year].similarity(a, b)
+
+    def _analogy(self, year: str, pos: Tuple[str, ...], neg: Tuple[str, ...], topn: int) -> Optional[List[Tuple[str, float]]]:
+        return self.store[year].analogy(list(pos), list(neg), topn)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: getattr(self, name).cache_info()._asdict() for name in ("neighbors", "similarity", "analogy")}
+
+    def handle(self, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        if path == "/years":
+            return 200, self.store.names
+        if path == "/stats":
+            return 200, self.cache_stats()
+
+        years = [params["year"]] if "year" in params else self.store.names
+        unknown = [y for y in years if y not in self.store.years]
+        if unknown:
+            return 404, {"error": f"unknown year: {unknown[0]}"}
+        topn = int(params.get("topn", TOPN))
+        if not 1 <= topn <= MAX_TOPN:
+            return 400, {"error": f"topn must be between 1 and {MAX_TOPN}"}
+
+        if path == "/neighbors" and "word" in params:
+            return 200, {y: self.neighbors(y, params["word"], topn) for y in years}
+        if path == "/similarity" and "a" in params and "b" in params:
+            return 200, {y: self.similarity(y, params["a"], params["b"]) for y in years}
+        if path == "/analogy" and "pos" in params:
+            pos = tuple(params["pos"].split(","))
+            neg = tuple(w for w in params.get("neg", "").split(",") if w)
+            return 200, {y: self.analogy(y, pos, neg, topn) for y in years}
+        return 400, {"error": f"bad query: {path}"}
+
+
+# -------------------------
+# HTTP
+# -------------------------
+def make_server(service: QueryService, host: str = HOST, port: int = PORT) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                status, body = service.handle(url.path, params)
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main() -> None:
+    if EXPORT:
+        for name in vectors.export(vectors.MODEL_DIR, vectors.VECTOR_DIR, dtype=DTYPE):
+            print("wrote", vectors.VECTOR_DIR / f"{name}.{DTYPE}.npy")
+
+    service = QueryService(VectorStore(vectors.VECTOR_DIR, dtype=DTYPE), CACHE_SIZE)
+    server = make_server(service, HOST, PORT)
+    print(f"serving {len(service.store.names)} years ({DTYPE}) on http://{HOST}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Resident HTTP/JSON query service over vectors/")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    ap.add_argument("--no-export", action="store_true", help="serve vectors/ as is")
+    ap.add_argument("--dtype", choices=vectors.DTYPES, default=DTYPE)
+    args = ap.parse_args()
+    HOST, PORT, CACHE_SIZE, DTYPE = args.host, args.port, args.cache_size, args.dtype
+    EXPORT = not args.no_export
+    main()
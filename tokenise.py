@@ -155,9 +155,12 @@ from __future__ import annotations
 
 import re
 from pathlib import Path
-from typing import Iterator, List, Optional
+from typing import Iterator, List, Optional, Tuple
 
-from sudachipy import dictionary
+from compounds import COMPOUND_FILE, CompoundTrie, load_trie
+from corpus_stats import iter_token_blocks
+from instrument import RunReport
+from provenance import ProvenanceWriter, provenance_path
 
 
 # -------------------------
@@ -165,7 +168,6 @@ from sudachipy import dictionary
 # -------------------------
 IN_DIR = Path("txt_clean")   # 2017.clean.txt ... 2025.clean.txt
 OUT_DIR = Path("tokens")
-OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 SPLIT_MODE = "C"  # A/B/C
 
@@ -178,6 +180,20 @@ DROP_POS_PREFIXES = {"助詞", "助動詞", "記号", "補助記号", "連体詞
 
 MIN_TOKEN_LEN = 1
 
+# Compound protection: merge morpheme runs listed in COMPOUND_FILE (see compounds.py)
+USE_COMPOUNDS = True
+
+# SOURCE/PAGE marker lines written by pdftotxt.py; they are kept out of the
+# token stream and recorded in a [year].prov.json sidecar (see provenance.py)
+MARKER_PAT = re.compile(r"^[ \t]*(?:###\s*SOURCE:\s*(.+?)\s*###|##\s*PAGE\s+(\d+)\s*##)[ \t]*$", re.M)
+
+# Also write [year].sentences.txt in gensim LineSentence format (one sentence
+# per line) for corpus_file training. Sentences end after SENT_END tokens and
+# are cut at MAX_SENTENCE_LEN, since gensim ignores words past 10000 per sentence.
+WRITE_SENTENCES = True
+SENT_END = {"。", "！", "？"}
+MAX_SENTENCE_LEN = 10000
+
 
 # -------------------------
 # Helpers
@@ -199,6 +215,66 @@ def year_from_filename(p: Path) -> str:
     return m.group(1) if m else p.stem.split(".")[0]
 
 
+def iter_marked_segments(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Split text at SOURCE/PAGE marker lines.
+    Yields ("text", segment), ("source", pdf name) or ("page", page number).
+    """
+    pos = 0
+    for m in MARKER_PAT.finditer(text):
+        if m.start() > pos:
+            yield "text", text[pos:m.start()]
+        if m.group(1) is not None:
+            yield "source", m.group(1)
+        else:
+            yield "page", m.group(2)
+        pos = m.end()
+    if pos < len(text):
+        yield "text", text[pos:]
+
+
+def sentences_path(tokens_path: Path) -> Path:
+    return tokens_path.with_name(tokens_path.name.replace(".tokens.txt", ".sentences.txt"))
+
+
+class SentenceWriter:
+    """
+    Writes tokens as LineSentence lines (see SENT_END / MAX_SENTENCE_LEN).
+    """
+
+    def __init__(self, f) -> None:
+        self.f = f
+        self.n = 0
+        self.words = 0
+
+    def add(self, tok: str) -> None:
+        self.f.write(" " + tok if self.n else tok)
+        self.n += 1
+        self.words += 1
+        if tok in SENT_END or self.n >= MAX_SENTENCE_LEN:
+            self.f.write("\n")
+            self.n = 0
+
+    def close(self) -> None:
+        if self.n:
+            self.f.write("\n")
+            self.n = 0
+
+
+def write_sentences(tokens_path: Path, out_path: Optional[Path] = None) -> int:
+    """
+    Convert an existing tokens file to LineSentence format. Returns word count.
+    """
+    out_path = out_path or sentences_path(tokens_path)
+    with out_path.open("w", encoding="utf-8") as f:
+        sw = SentenceWriter(f)
+        for block in iter_token_blocks(tokens_path):
+            for tok in block:
+                sw.add(tok)
+        sw.close()
+    return sw.words
+
+
 def iter_chunks_by_paragraph(text: str, max_bytes: int = MAX_BYTES) -> Iterator[str]:
     """
     Yield chunks <= max_bytes (UTF-8), trying to keep paragraph boundaries.
@@ -280,35 +356,72 @@ def iter_chunks_by_paragraph(text: str, max_bytes: int = MAX_BYTES) -> Iterator[
     yield from flush()
 
 
-def tokenise_to_file(text: str, out_path: Path, tokenizer) -> int:
+def tokenise_to_file(
+    text: str,
+    out_path: Path,
+    tokenizer,
+    compounds: Optional[CompoundTrie] = None,
+) -> int:
     """
     Tokenise a large text by chunks, streaming output to file.
+    If a compound trie is given, listed compounds are merged per chunk.
+    SOURCE/PAGE markers are written to a provenance sidecar next to out_path,
+    and with WRITE_SENTENCES the same tokens go to a LineSentence file.
     Returns token count.
     """
     mode = get_split_mode(tokenizer)
     token_count = 0
+    word_count = 0  # whitespace-separated tokens, i.e. positions in text.split()
+    prov = ProvenanceWriter()
+
+    sent_file = sentences_path(out_path).open("w", encoding="utf-8") if WRITE_SENTENCES else None
+    sentences = SentenceWriter(sent_file) if sent_file else None
 
     with out_path.open("w", encoding="utf-8") as out:
         first = True
-        for chunk in iter_chunks_by_paragraph(text, MAX_BYTES):
-            ms = tokenizer.tokenize(chunk, mode)
-            for m in ms:
-                s = m.surface()
-                if not s or len(s) < MIN_TOKEN_LEN:
-                    continue
-
-                if USE_STOPWORDS:
-                    pos = list(m.part_of_speech())
-                    if should_drop_by_pos(pos):
+        for kind, value in iter_marked_segments(text):
+            if kind == "source":
+                prov.start_source(value, word_count)
+                continue
+            if kind == "page":
+                prov.start_page(int(value), word_count)
+                continue
+
+            for chunk in iter_chunks_by_paragraph(value, MAX_BYTES):
+                ms = tokenizer.tokenize(chunk, mode)
+                surfaces: List[str] = []
+                for m in ms:
+                    s = m.surface()
+                    if not s or len(s) < MIN_TOKEN_LEN:
                         continue
 
-                if first:
-                    out.write(s)
-                    first = False
-                else:
-                    out.write(" " + s)
-                token_count += 1
-
+                    if USE_STOPWORDS:
+                        pos = list(m.part_of_speech())
+                        if should_drop_by_pos(pos):
+                            continue
+
+                    surfaces.append(s)
+
+                if compounds is not None:
+                    surfaces = compounds.merge(surfaces)
+
+                for s in surfaces:
+                    if first:
+                        out.write(s)
+                        first = False
+                    else:
+                        out.write(" " + s)
+                    token_count += 1
+                    words = s.split()
+                    word_count += len(words)
+                    if sentences is not None:
+                        for w in words:
+                            sentences.add(w)
+
+    if sent_file is not None:
+        sentences.close()
+        sent_file.close()
+    prov.save(provenance_path(out_path), word_count)
     return token_count
 
 
@@ -316,23 +429,33 @@ def tokenise_to_file(text: str, out_path: Path, tokenizer) -> int:
 # Main
 # -------------------------
 def main() -> None:
+    from sudachipy import dictionary
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
     tokenizer = dictionary.Dictionary().create()
 
     files = sorted(IN_DIR.glob("*.txt"))
     if not files:
         raise SystemExit(f"No .txt files found in {IN_DIR.resolve()}")
 
+    compounds = load_trie(COMPOUND_FILE) if USE_COMPOUNDS else None
+
     print("Input files:", len(files))
     print("Split mode:", SPLIT_MODE, "Stopwords:", USE_STOPWORDS, "MAX_BYTES:", MAX_BYTES)
+    print("Compounds:", len(compounds) if compounds is not None else "off")
 
+    report = RunReport("tokenise")
     for p in files:
         year = year_from_filename(p)
-        text = p.read_text(encoding="utf-8", errors="ignore")
+        with report.stage("tokenise", year) as st:
+            text = p.read_text(encoding="utf-8", errors="ignore")
 
-        out_path = OUT_DIR / f"{year}.tokens.txt"
-        n = tokenise_to_file(text, out_path, tokenizer)
+            out_path = OUT_DIR / f"{year}.tokens.txt"
+            n = tokenise_to_file(text, out_path, tokenizer, compounds)
+            st.add(bytes=len(text.encode("utf-8")), tokens=n)
         print(f"wrote {out_path} tokens={n}")
 
+    report.save()
     print("Done.")
 
 
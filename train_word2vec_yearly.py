@@ -1,40 +1,264 @@
+import tempfile
 from pathlib import Path
-from gensim.models import Word2Vec
+
+from corpus_stats import iter_token_blocks
+from instrument import RunReport
+from tokenise import MAX_SENTENCE_LEN, SENT_END, SentenceWriter, sentences_path, write_sentences
 
 TOKEN_DIR = Path("tokens")
 MODEL_DIR = Path("models")
-MODEL_DIR.mkdir(exist_ok=True)
 
 VECTOR_SIZE = 200
 WINDOW = 5
 MIN_COUNT = 5
 EPOCHS = 20
+WORKERS = 4
+
+# True: gensim の corpus_file モード（LineSentence ファイルを C 側で読むため GIL に縛られず
+# ワーカー数に応じて速くなる）/ False: Python のイテレータから学習
+CORPUS_FILE = True
+
+# "yearly": 1年1モデル / "window": 連続する WINDOW_YEARS 年ごとに1モデル
+# "joint": 全年で1モデル（TARGETS を「語_年」に置き換えて学習する temporal referencing）
+MODE = "yearly"
+WINDOW_YEARS = 3
+WINDOW_STEP = 1
+TARGETS = ["科学", "イノベーション"]
+
+
+def tagged(word, year):
+    return f"{word}_{year}"
+
 
+class TokenStream:
+    """
+    複数年のトークンファイルを連結せずに順に読み、文単位で返す（再走査可能）
+    targets を与えると、その語を読み込み時に「語_年」へ置き換える
+    """
 
-def load_tokens(path):
-    text = path.read_text(encoding="utf-8")
-    tokens = text.split()
-    return [tokens]  # gensimは文リストが必要
+    def __init__(self, paths, targets=()):
+        self.paths = list(paths)
+        self.targets = set(targets)
 
+    def __iter__(self):
+        for path in self.paths:
+            year = path.name.split(".")[0]
+            sent = []
+            for block in iter_token_blocks(path):
+                for tok in block:
+                    if tok in self.targets:
+                        tok = tagged(tok, year)
+                    sent.append(tok)
+                    if tok in SENT_END or len(sent) >= MAX_SENTENCE_LEN:
+                        yield sent
+                        sent = []
+            if sent:
+                yield sent
 
-for file in sorted(TOKEN_DIR.glob("20*.tokens.txt")):
-    year = file.stem.split(".")[0]
 
-    print("training", year)
+def write_corpus(stream, path):
+    """
+    文のストリームを LineSentence 形式で書き出し、語数を返す
+    """
+    with path.open("w", encoding="utf-8") as f:
+        sw = SentenceWriter(f)
+        for sent in stream:
+            for tok in sent:
+                sw.add(tok)
+            sw.close()
+    return sw.words
 
-    sentences = load_tokens(file)
 
-    model = Word2Vec(
-        sentences=sentences,
+def ensure_sentences(tokens_path):
+    """
+    tokenise.py が書いた [year].sentences.txt（無い・古い場合はトークンファイルから作る）
+    """
+    path = sentences_path(tokens_path)
+    if not path.exists() or path.stat().st_mtime < tokens_path.stat().st_mtime:
+        write_sentences(tokens_path, path)
+    return path
+
+
+def new_model(**kw):
+    from gensim.models import Word2Vec
+
+    return Word2Vec(
         vector_size=VECTOR_SIZE,
         window=WINDOW,
         min_count=MIN_COUNT,
         sg=1,  # skip-gram
-        epochs=EPOCHS,
-        workers=4
+        workers=WORKERS,
+        **kw
     )
 
-    save_path = MODEL_DIR / f"{year}.model"
-    model.save(str(save_path))
 
-print("done")
\ No newline at end of file
+def fit(word_freq, stream, total_words):
+    """
+    語彙は頻度から作り（走査なし）、学習のみ行う。
+    CORPUS_FILE のときは stream を一時ファイルに書き出して corpus_file で学習する。
+    """
+    model = new_model()
+    model.build_vocab_from_freq(word_freq)
+    if not CORPUS_FILE:
+        model.train(stream, total_words=total_words, epochs=EPOCHS)
+        return model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "corpus.txt"
+        n_words = write_corpus(stream, path)
+        model.train(corpus_file=str(path), total_words=n_words, epochs=EPOCHS)
+    return model
+
+
+def year_windows(years, size, step):
+    for i in range(0, max(1, len(years) - size + 1), step):
+        yield years[i:i + size]
+
+
+def shared_counts():
+    """
+    年×語彙の頻度行列（corpus_stats.py の出力）を読み込む。無い・古い場合は作り直す。
+    """
+    import numpy as np
+
+    from corpus_stats import OUT_DIR, encode_corpus, frequency_matrix, load_stats
+
+    freq = OUT_DIR / "freq.npz"
+    newest = max(p.stat().st_mtime for p in TOKEN_DIR.glob("20*.tokens.txt"))
+    if freq.exists() and freq.stat().st_mtime >= newest:
+        vocab, years, counts = load_stats(OUT_DIR)
+        return vocab.itos, years, counts
+
+    vocab, ids = encode_corpus(TOKEN_DIR)
+    years, counts = frequency_matrix(ids, len(vocab))
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    vocab.save(OUT_DIR / "vocab.txt")
+    np.savez_compressed(freq, years=np.array(years), counts=counts)
+    return vocab.itos, years, counts
+
+
+def train_yearly(report):
+    for file in sorted(TOKEN_DIR.glob("20*.tokens.txt")):
+        year = file.stem.split(".")[0]
+
+        print("training", year)
+
+        with report.stage("train", year) as st:
+            if CORPUS_FILE:
+                model = new_model(corpus_file=str(ensure_sentences(file)), epochs=EPOCHS)
+            else:
+                model = new_model(sentences=TokenStream([file]), epochs=EPOCHS)
+
+            save_path = MODEL_DIR / f"{year}.model"
+            model.save(str(save_path))
+            st.add(words=model.corpus_total_words * EPOCHS)
+
+
+def train_windows(report):
+    """
+    語彙は全年分の頻度行列から窓ごとに行を足し合わせて作る（コーパスの再走査なし）。
+    各窓では学習のための走査のみ行う。
+    """
+    with report.stage("vocab") as st:
+        itos, years, counts = shared_counts()
+        st.add(types=len(itos))
+
+    for span in year_windows(years, WINDOW_YEARS, WINDOW_STEP):
+        name = f"window_{span[0]}-{span[-1]}"
+        rows = [years.index(y) for y in span]
+        window_counts = counts[rows].sum(axis=0)
+        word_freq = {itos[i]: int(c) for i, c in enumerate(window_counts) if c > 0}
+        total_words = int(window_counts.sum())
+
+        print("training", name)
+
+        with report.stage("train", name) as st:
+            model = fit(word_freq, TokenStream(TOKEN_DIR / f"{y}.tokens.txt" for y in span), total_words)
+            model.save(str(MODEL_DIR / f"{name}.model"))
+            st.add(words=total_words * EPOCHS)
+
+
+def train_joint(report):
+    """
+    全年を1回の学習で扱う。TARGETS は年ごとに別語彙（例: 科学_2019）になるため、
+    年別ベクトルが同じ空間に入り、整列なしで直接比較できる。
+    """
+    import numpy as np
+
+    with report.stage("vocab") as st:
+        itos, years, counts = shared_counts()
+        st.add(types=len(itos))
+
+    total = counts.sum(axis=0)
+    word_freq = {itos[i]: int(c) for i, c in enumerate(total) if c > 0}
+    stoi = {w: i for i, w in enumerate(itos)}
+    for t in TARGETS:
+        if t not in stoi:
+            continue
+        word_freq.pop(t, None)
+        for row, y in enumerate(years):
+            c = int(counts[row, stoi[t]])
+            if c > 0:
+                word_freq[tagged(t, y)] = c
+    total_words = int(total.sum())
+
+    print("training joint", years[0], "-", years[-1], "targets:", ", ".join(TARGETS))
+
+    with report.stage("train_joint") as st:
+        stream = TokenStream((TOKEN_DIR / f"{y}.tokens.txt" for y in years), TARGETS)
+        model = fit(word_freq, stream, total_words)
+        model.save(str(MODEL_DIR / "joint.model"))
+        st.add(words=total_words * EPOCHS)
+
+    # 各年の目標語ベクトルの、前年・初年とのコサイン類似度
+    for t in TARGETS:
+        keys = [tagged(t, y) for y in years if tagged(t, y) in model.wv]
+        if not keys:
+            continue
+        vecs = np.stack([model.wv.get_vector(k, norm=True) for k in keys])
+        print(f"\n{t}: year  sim(prev)  sim(first)")
+        for i, k in enumerate(keys):
+            prev = float(vecs[i] @ vecs[i - 1]) if i else 1.0
+            print(f"  {k:20s} {prev:.3f}  {float(vecs[i] @ vecs[0]):.3f}")
+
+    joint = report.stages[-1].wall
+    yearly = last_yearly_total()
+    if yearly is None:
+        print(f"\njoint training: {joint:.1f}s (run --mode yearly for a comparison)")
+    else:
+        print(f"\njoint training: {joint:.1f}s vs per-year loop: {yearly:.1f}s (last yearly report)")
+
+
+def last_yearly_total():
+    """
+    直近の per-year 学習レポートにおける学習時間の合計（無ければ None）
+    """
+    import json
+
+    from instrument import REPORT_DIR
+
+    for path in sorted(REPORT_DIR.glob("train_*/report.json"), reverse=True):
+        stages = json.loads(path.read_text(encoding="utf-8"))["stages"]
+        yearly = [s for s in stages if s["stage"] == "train" and str(s["year"]).isdigit()]
+        if yearly:
+            return sum(s["wall_s"] for s in yearly)
+    return None
+
+
+def main():
+    MODEL_DIR.mkdir(exist_ok=True)
+
+    report = RunReport("train")
+    if MODE == "window":
+        train_windows(report)
+    elif MODE == "joint":
+        train_joint(report)
+    else:
+        train_yearly(report)
+
+    report.save()
+    print("done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Per-year word vectors exported from models/ for memory-mapped queries
+
+Input:
+  ./models/[name].model      (train_word2vec_yearly.py)
+Output (./vectors/):
+  vocab.txt                  shared vocabulary over all exported years
+                             (line no. = word id; append-only)
+  [name].[dtype].npy         unit-normalised vectors, dtype one of
+                             float32 / float16 / int8
+  [name].[dtype].ids.npy     word id of each row (uint32); per dtype, so
+                             re-exporting one dtype after retraining never
+                             pairs another dtype's rows with new ids
+  [name].scale.npy           int8 only: per-row scale (float32),
+                             vector ~= int8 row * scale
+
+Only the word vectors are kept (no training state), and with float16 or
+int8 a year takes 1/2 or about 1/4 of the float32 size. Queries run on
+the stored arrays directly: scores are computed in blocks of BLOCK_ROWS
+rows, each converted to float32 on the fly, and int8 scores are
+multiplied by the row scales afterwards.
+
+export() is incremental: a model is re-exported only when it is newer
+than its array. Loading opens the arrays with np.load(mmap_mode="r"), so
+opening every year costs a few ms and no gensim import.
+
+Run:
+  python vectors.py                      # export models/20*.model as float32
+  python vectors.py --dtype int8 --glob "window_*.model"
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# -------------------------
+# Config
+# -------------------------
+MODEL_DIR = Path("models")
+VECTOR_DIR = Path("vectors")
+MODEL_GLOB = "20*.model"
+
+DTYPES = ("float32", "float16", "int8")
+DTYPE = "float32"
+
+# Rows converted to float32 at a time when scoring
+BLOCK_ROWS = 1 << 16
+
+
+# -------------------------
+# Quantization
+# -------------------------
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    (stored array, per-row scale or None) for dtype.
+    """
+    if dtype == "float32":
+        return vectors.astype(np.float32), None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scale = np.abs(vectors).max(axis=1) / 127
+        scale[scale == 0] = 1.0
+        q = np.rint(vectors / scale[:, None]).astype(np.int8)
+        return q, scale.astype(np.float32)
+    raise ValueError(f"unknown dtype: {dtype} (expected one of {', '.join(DTYPES)})")
+
+
+# -------------------------
+# Export
+# -------------------------
+def load_vocab(out_dir: Path = VECTOR_DIR) -> List[str]:
+    path = out_dir / "vocab.txt"
+    if not path.exists():
+        return []
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def ids_path(out_dir: Path, name: str, dtype: str) -> Path:
+    return out_dir / f"{name}.{dtype}.ids.npy"
+
+
+def export_model(model_path: Path, vocab: List[str], stoi: Dict[str, int],
+                 out_dir: Path = VECTOR_DIR, dtype: str = DTYPE) -> Path:
+    """
+    Write one model's vectors; new words are appended to vocab/stoi.
+    """
+    from gensim.models import Word2Vec
+
+    wv = Word2Vec.load(str(model_path)).wv
+    for w in wv.index_to_key:
+        if w not in stoi:
+            stoi[w] = len(vocab)
+            vocab.append(w)
+    ids = np.array([stoi[w] for w in wv.index_to_key], dtype=np.uint32)
+
+    name = model_path.stem
+    arr, scale = quantize(wv.get_normed_vectors(), dtype)
+    out = out_dir / f"{name}.{dtype}.npy"
+    np.save(out, arr)
+    np.save(ids_path(out_dir, name, dtype), ids)
+    if scale is not None:
+        np.save(out_dir / f"{name}.scale.npy", scale)
+    return out
+
+
+def export(model_dir: Path = MODEL_DIR, out_dir: Path = VECTOR_DIR,
+           pattern: str = MODEL_GLOB, dtype: str = DTYPE) -> List[str]:
+    """
+    Export models matching pattern whose vectors are missing or stale.
+    Returns the exported names.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    vocab = load_vocab(out_dir)
+    stoi = {w: i for i, w in enumerate(vocab)}
+
+    done: List[str] = []
+    for path in sorted(model_dir.glob(pattern)):
+        arr = out_dir / f"{path.stem}.{dtype}.npy"
+        if (arr.exists() and ids_path(out_dir, path.stem, dtype).exists()
+                and arr.stat().st_mtime >= path.stat().st_mtime):
+            continue
+        export_model(path, vocab, stoi, out_dir, dtype)
+        done.append(path.stem)
+
+    if done:
+        (out_dir / "vocab.txt").write_text("\n".join(vocab) + "\n", encoding="utf-8")
+    return done
+
+
+# -------------------------
+# Queries
+# -------------------------
+class YearVectors:
+    def __init__(self, name: str, vectors: np.ndarray, ids: np.ndarray,
+                 vocab: List[str], stoi: Dict[str, int], scale: Optional[np.ndarray] = None) -> None:
+        self.name = name
+        self.vectors = vectors
+        self.scale = scale
+        self.vocab = vocab
+        self.stoi = stoi
+        self.ids = ids
+        # shared word id -> row (-1 if the word is not in this year)
+        self.rows = np.full(len(vocab), -1, dtype=np.int64)
+        self.rows[ids] = np.arange(len(ids))
+
+    @classmethod
+    def load(cls, name: str, vocab: List[str], stoi: Dict[str, int],
+             out_dir: Path = VECTOR_DIR, dtype: str = DTYPE) -> "YearVectors":
+        vectors = np.load(out_dir / f"{name}.{dtype}.npy", mmap_mode="r")
+        ids = np.load(ids_path(out_dir, name, dtype))
+        scale = np.load(out_dir / f"{name}.scale.npy") if dtype == "int8" else None
+        return cls(name, vectors, ids, vocab, stoi, scale)
+
+    @property
+    def words(self) -> List[str]:
+        return [self.vocab[i] for i in self.ids]
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.ids.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def row(self, word: str) -> int:
+        i = self.stoi.get(word)
+        return -1 if i is None else int(self.rows[i])
+
+    def __contains__(self, word: str) -> bool:
+        return self.row(word) >= 0
+
+    def vector(self, word: str) -> np.ndarray:
+        r = self.row(word)
+        v = np.asarray(self.vectors[r], dtype=np.float32)
+        return v * self.scale[r] if self.scale is not None else v
+
+    def dense(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Rows start:stop as float32 (int8 rows multiplied by their scales).
+        """
+        v = np.asarray(self.vectors[start:stop], dtype=np.float32)
+        return v * self.scale[start:stop, None] if self.scale is not None else v
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        out = np.empty(len(self.vectors), dtype=np.float32)
+        for s in range(0, len(out), BLOCK_ROWS):
+            out[s:s + BLOCK_ROWS] = self.dense(s, s + BLOCK_ROWS) @ query
+        return out
+
+    def nearest(self, query: np.ndarray, topn: int, exclude: Sequence[int] = ()) -> List[Tuple[str, float]]:
+        if topn < 1:
+            raise ValueError(f"topn must be positive: {topn}")
+        sims = self.scores(query)
+        k = min(topn + len(exclude), len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        skip = set(exclude)
+        return [(self.vocab[self.ids[i]], float(sims[i])) for i in top if i not in skip][:topn]
+
+    def neighbors(self, word: str, topn: int) -> Optional[List[Tuple[str, float]]]:
+        if word not in self:
+            return None
+        return self.nearest(self.vector(word), topn, [self.row(word)])
+
+    def similarity(self, a: str, b: str) -> Optional[float]:
+        if a not in self or b not in self:
+            return None
+        return float(self.vector(a) @ self.vector(b))
+
+    def analogy(self, positive: List[str], negative: List[str], topn: int) -> Optional[List[Tuple[str, float]]]:
+        """
+        3CosAdd, as gensim's most_similar(positive, negative).
+        """
+        if any(w not in self for w in positive + negative):
+            return None
+        query = np.sum([self.vector(w) for w in positive], axis=0)
+        for w in negative:
+            query -= self.vector(w)
+        query /= np.linalg.norm(query) or 1.0
+        return self.nearest(query, topn, [self.row(w) for w in positive + negative])
+
+
+class VectorStore:
+    """
+    All exported years of one dtype, opened memory-mapped, sharing one vocabulary.
+    """
+
+    def __init__(self, out_dir: Path = VECTOR_DIR, pattern: str = MODEL_GLOB, dtype: str = DTYPE) -> None:
+        suffix = f".{dtype}.npy"
+        names = sorted(p.name[:-len(suffix)] for p in out_dir.glob(pattern.replace(".model", suffix)))
+        if not names:
+            raise SystemExit(f"No {dtype} vectors found in {out_dir.resolve()} (run vectors.py first)")
+        self.vocab = load_vocab(out_dir)
+        self.stoi = {w: i for i, w in enumerate(self.vocab)}
+        self.years: Dict[str, YearVectors] = {
+            n: YearVectors.load(n, self.vocab, self.stoi, out_dir, dtype) for n in names
+        }
+
+    def __getitem__(self, year: str) -> YearVectors:
+        return self.years[year]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.years)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(y.nbytes for y in self.years.values())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Export per-year vectors from models/")
+    ap.add_argument("--glob", default=MODEL_GLOB)
+    ap.add_argument("--dtype", choices=DTYPES, default=DTYPE)
+    args = ap.parse_args()
+
+    for name in export(MODEL_DIR, VECTOR_DIR, args.glob, args.dtype):
+        print("wrote", VECTOR_DIR / f"{name}.{args.dtype}.npy")
+
+
+if __name__ == "__main__":
+    main()